@@ -14,11 +14,31 @@ stack_prefix = app.node.try_get_context("stack_prefix") or os.environ.get(
     "STACK_PREFIX", "ndl-ocr"
 )
 lambda_memory = int(
-    app.node.try_get_context("lambda_memory") or os.environ.get("LAMBDA_MEMORY_MB", "3008")
+    app.node.try_get_context("lambda_memory") or os.environ.get("LAMBDA_MEMORY_MB", "5120")
 )
 lambda_timeout = int(
     app.node.try_get_context("lambda_timeout") or os.environ.get("LAMBDA_TIMEOUT_SEC", "60")
 )
+efs_throughput = int(
+    app.node.try_get_context("efs_throughput_mibps")
+    or os.environ.get("EFS_THROUGHPUT_MIBPS", "0")
+)
+quantize_recognizers = str(
+    app.node.try_get_context("quantize_recognizers")
+    or os.environ.get("QUANTIZE_RECOGNIZERS", "false")
+).lower() in ("1", "true")
+reserved_concurrency = int(
+    app.node.try_get_context("reserved_concurrency")
+    or os.environ.get("RESERVED_CONCURRENCY", "0")
+)
+provisioned_concurrency = int(
+    app.node.try_get_context("provisioned_concurrency")
+    or os.environ.get("PROVISIONED_CONCURRENCY", "0")
+)
+provisioned_concurrency_max = int(
+    app.node.try_get_context("provisioned_concurrency_max")
+    or os.environ.get("PROVISIONED_CONCURRENCY_MAX", "5")
+)
 
 ocr_stack = OcrLambdaStack(
     app,
@@ -26,6 +46,11 @@ ocr_stack = OcrLambdaStack(
     stack_prefix=stack_prefix,
     lambda_memory_mb=lambda_memory,
     lambda_timeout_sec=lambda_timeout,
+    efs_throughput_mibps=efs_throughput,
+    quantize_recognizers=quantize_recognizers,
+    reserved_concurrency=reserved_concurrency,
+    provisioned_concurrency=provisioned_concurrency,
+    provisioned_concurrency_max=provisioned_concurrency_max,
 )
 
 gateway_stack = GatewayStack(
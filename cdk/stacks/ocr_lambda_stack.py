@@ -12,6 +12,7 @@ Architecture:
 
 from __future__ import annotations
 
+import glob
 import hashlib
 import os
 
@@ -22,8 +23,11 @@ from aws_cdk import (
     RemovalPolicy,
     Stack,
     aws_cloudwatch as cloudwatch,
+    aws_dynamodb as dynamodb,
     aws_ec2 as ec2,
     aws_efs as efs,
+    aws_events as events,
+    aws_events_targets as targets,
     aws_lambda as lambda_,
     aws_logs as logs,
     aws_s3 as s3,
@@ -31,6 +35,32 @@ from aws_cdk import (
 from constructs import Construct
 
 _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+_LAMBDA_DIR = os.path.join(_PROJECT_ROOT, "lambda")
+_VENDOR_SRC = os.path.join(_LAMBDA_DIR, "vendor", "ndlocr-lite", "src")
+
+
+def _tree_hash(*paths: str) -> str:
+    """Short sha256 over the relative paths and contents of files under paths.
+
+    Missing paths are skipped; __pycache__ and *.pyc are ignored.
+    """
+    hasher = hashlib.sha256()
+    for path in paths:
+        if os.path.isfile(path):
+            files = [path]
+        else:
+            files = sorted(
+                os.path.join(root, name)
+                for root, dirs, names in os.walk(path)
+                if "__pycache__" not in root.split(os.sep)
+                for name in names
+                if not name.endswith(".pyc")
+            )
+        for fpath in files:
+            hasher.update(os.path.relpath(fpath, _PROJECT_ROOT).encode())
+            with open(fpath, "rb") as f:
+                hasher.update(f.read())
+    return hasher.hexdigest()[:16]
 
 
 class OcrLambdaStack(Stack):
@@ -42,27 +72,46 @@ class OcrLambdaStack(Stack):
         construct_id: str,
         *,
         stack_prefix: str,
-        lambda_memory_mb: int = 3008,
+        lambda_memory_mb: int = 5120,
         lambda_timeout_sec: int = 60,
+        efs_throughput_mibps: int = 0,
+        quantize_recognizers: bool = False,
+        reserved_concurrency: int = 0,
+        provisioned_concurrency: int = 0,
+        provisioned_concurrency_max: int = 5,
         **kwargs,
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
         # --- VPC (required for EFS) ---
+        # One NAT gateway per AZ so a burst of cold starts isn't funneled
+        # through a single gateway (and survives an AZ outage).
         vpc = ec2.Vpc(
             self,
             "Vpc",
             max_azs=2,
-            nat_gateways=1,
+            nat_gateways=2,
         )
 
         # --- EFS for models, source, config, and Python deps ---
+        # Cold starts read ~150MB of ONNX models over NFS. Elastic throughput
+        # by default; a provisioned floor avoids throttling under scale-out.
+        if efs_throughput_mibps:
+            throughput = {
+                "throughput_mode": efs.ThroughputMode.PROVISIONED,
+                "provisioned_throughput_per_second": cdk.Size.mebibytes(
+                    efs_throughput_mibps
+                ),
+            }
+        else:
+            throughput = {"throughput_mode": efs.ThroughputMode.ELASTIC}
+
         file_system = efs.FileSystem(
             self,
             "ModelFs",
             vpc=vpc,
             performance_mode=efs.PerformanceMode.GENERAL_PURPOSE,
-            throughput_mode=efs.ThroughputMode.ELASTIC,
+            **throughput,
             removal_policy=RemovalPolicy.DESTROY,
             encrypted=True,
         )
@@ -89,6 +138,18 @@ class OcrLambdaStack(Stack):
             versioned=False,
         )
 
+        # --- DynamoDB cache of OCR results for S3 inputs (keyed by ETag) ---
+        self.result_cache = dynamodb.Table(
+            self,
+            "OcrResultCache",
+            partition_key=dynamodb.Attribute(
+                name="image_key", type=dynamodb.AttributeType.STRING,
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="ttl",
+            removal_policy=RemovalPolicy.DESTROY,
+        )
+
         # --- CloudWatch Log Group ---
         log_group = logs.LogGroup(
             self,
@@ -120,22 +181,35 @@ class OcrLambdaStack(Stack):
                 "LAMBDA_LAYER_DIR": "/mnt/models",
                 "NDLOCR_SRC_DIR": "/mnt/models/src",
                 "IMAGE_BUCKET": self.bucket.bucket_name,
+                "RESULT_CACHE_TABLE": self.result_cache.table_name,
                 # Add EFS python packages to PYTHONPATH
                 "PYTHONPATH": "/mnt/models/python",
+                "QUANTIZE_RECOGNIZERS": "1" if quantize_recognizers else "0",
             },
             vpc=vpc,
             filesystem=efs_mount,
             log_group=log_group,
-            # Note: SnapStart is incompatible with EFS in current CDK.
-            # Warm invocations reuse module-level model objects regardless.
+            # Opt-in cap on concurrent cold starts so simultaneous model loads
+            # don't saturate EFS throughput and time out together. Unreserved
+            # by default: Lambda rejects reservations that would leave the
+            # account with fewer than 100 unreserved executions.
+            reserved_concurrent_executions=reserved_concurrency or None,
+            # Note: SnapStart is not supported for functions that mount EFS,
+            # and lazy model loading would only move the EFS read onto the
+            # first request. Init stays eager and is pre-paid by provisioned
+            # concurrency and the keep-warm schedule below.
         )
 
         # Grant S3 read/write access (write for presigned upload URLs)
         self.bucket.grant_read_write(self.lambda_function)
+        self.result_cache.grant_read_write_data(self.lambda_function)
 
         # --- EFS Provisioner (Custom Resource) ---
         # Populates EFS with vendor files and pip-installed dependencies.
-        # Bundles the full vendor submodule (~148MB) in its deployment package.
+        # Bundles only vendor/ndlocr-lite/src (~148MB: source, models, config),
+        # the part it copies; the rest of the submodule is never staged.
+        # A separate asset from OcrFunction on purpose: sharing one would
+        # ship the models inside the OCR function's zip.
         provisioner_fn = lambda_.Function(
             self,
             "EfsProvisioner",
@@ -144,24 +218,38 @@ class OcrLambdaStack(Stack):
             handler="provisioner.handler",
             code=lambda_.Code.from_asset(
                 os.path.join(_PROJECT_ROOT, "lambda"),
-                exclude=["*.pyc", "__pycache__"],
+                exclude=[
+                    "*.pyc",
+                    "__pycache__",
+                    "vendor/ndlocr-lite/*",
+                    "!vendor/ndlocr-lite/src",
+                ],
             ),
             memory_size=1024,
             ephemeral_storage_size=cdk.Size.gibibytes(2),
             timeout=Duration.minutes(15),
             architecture=lambda_.Architecture.X86_64,
+            environment={
+                "QUANTIZE_RECOGNIZERS": "1" if quantize_recognizers else "0",
+            },
             vpc=vpc,
             filesystem=efs_mount,
         )
 
-        # Hash requirements.txt and provisioner code to trigger re-provisioning
-        hasher = hashlib.sha256()
-        for fname in ("layers/requirements.txt", "lambda/provisioner.py"):
-            fpath = os.path.join(_PROJECT_ROOT, fname)
-            if os.path.exists(fpath):
-                with open(fpath, "rb") as f:
-                    hasher.update(f.read())
-        provision_hash = hasher.hexdigest()[:16]
+        # Hash everything the provisioner puts on EFS (dependencies, its own
+        # code, vendored source/models/config) to trigger re-provisioning
+        provision_hash = _tree_hash(
+            os.path.join(_PROJECT_ROOT, "layers", "requirements.txt"),
+            os.path.join(_LAMBDA_DIR, "provisioner.py"),
+            _VENDOR_SRC,
+        )
+        # Cached OCR results are only valid for the handler code and EFS
+        # contents that produced them; the result cache keys on this hash.
+        handler_hash = _tree_hash(*sorted(glob.glob(os.path.join(_LAMBDA_DIR, "*.py"))))
+        ocr_asset_hash = hashlib.sha256(
+            f"{provision_hash}:{handler_hash}".encode()
+        ).hexdigest()[:16]
+        self.lambda_function.add_environment("OCR_ASSET_HASH", ocr_asset_hash)
 
         CustomResource(
             self,
@@ -169,16 +257,44 @@ class OcrLambdaStack(Stack):
             service_token=provisioner_fn.function_arn,
             properties={
                 "ProvisionHash": provision_hash,
+                "QuantizeRecognizers": str(quantize_recognizers).lower(),
             },
         )
 
-        # Publish a version and create alias
+        # Publish a version and create alias.
+        # Provisioned concurrency keeps pre-initialized environments (4 ONNX
+        # models already loaded from EFS) so requests skip the model-load cold start.
         version = self.lambda_function.current_version
         self.lambda_alias = lambda_.Alias(
             self,
             "LiveAlias",
             alias_name="live",
             version=version,
+            provisioned_concurrent_executions=provisioned_concurrency or None,
+        )
+
+        if provisioned_concurrency:
+            # Scale provisioned environments with traffic (70% utilization target)
+            scaling = self.lambda_alias.add_auto_scaling(
+                min_capacity=provisioned_concurrency,
+                max_capacity=max(provisioned_concurrency, provisioned_concurrency_max),
+            )
+            scaling.scale_on_utilization(utilization_target=0.7)
+
+        # --- Keep-warm schedule ---
+        # Periodic pings keep EFS-initialized environments from being recycled.
+        # The handler short-circuits {"warmup": true} before any OCR work.
+        events.Rule(
+            self,
+            "WarmupRule",
+            schedule=events.Schedule.rate(Duration.minutes(5)),
+            targets=[
+                targets.LambdaFunction(
+                    self.lambda_alias,
+                    event=events.RuleTargetInput.from_object({"warmup": True}),
+                    retry_attempts=0,
+                )
+            ],
         )
 
         # --- CloudWatch Alarms ---
@@ -208,6 +324,40 @@ class OcrLambdaStack(Stack):
             alarm_description=f"p95 duration > 30s for {stack_prefix}-ocr",
         )
 
+        if reserved_concurrency:
+            cloudwatch.Alarm(
+                self,
+                "ConcurrencyAlarm",
+                metric=self.lambda_function.metric(
+                    "ConcurrentExecutions",
+                    period=Duration.minutes(1),
+                    statistic="Maximum",
+                ),
+                threshold=int(reserved_concurrency * 0.8),
+                evaluation_periods=1,
+                comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD,
+                alarm_description=(
+                    f"Concurrent executions >= 80% of reserved concurrency "
+                    f"({reserved_concurrency}) for {stack_prefix}-ocr"
+                ),
+            )
+
+        cloudwatch.Alarm(
+            self,
+            "EfsIoLimitAlarm",
+            metric=cloudwatch.Metric(
+                namespace="AWS/EFS",
+                metric_name="PercentIOLimit",
+                dimensions_map={"FileSystemId": file_system.file_system_id},
+                period=Duration.minutes(5),
+                statistic="Maximum",
+            ),
+            threshold=90,
+            evaluation_periods=1,
+            comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD,
+            alarm_description=f"EFS I/O limit >= 90% for {stack_prefix} model file system",
+        )
+
         # --- Outputs ---
         self.file_system = file_system
         self.vpc = vpc
@@ -1,32 +1,37 @@
 """AWS Lambda handler for NDL-OCR Lite.
 
-Module-level initialization loads 4 ONNX models (1 DEIM + 3 PARSeq).
-SnapStart snapshots this state so cold starts restore in <1s.
+Module-level initialization loads 4 ONNX models (1 DEIM + 3 PARSeq) from EFS.
+SnapStart cannot be used with EFS, so init stays eager: provisioned
+concurrency and the keep-warm schedule pay it before a request arrives.
 """
 
 from __future__ import annotations
 
+import json
+import logging
 import os
-import shutil
-import traceback
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import boto3
-from yaml import safe_load
+from botocore.config import Config
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
 
 # ---------------------------------------------------------------------------
-# Module-level model loading (executed once, then snapshotted by SnapStart)
+# Module-level model loading (executed once per execution environment)
 # ---------------------------------------------------------------------------
 
-# On Lambda: source/models/config live in the Layer at /opt.
+# On Lambda: source/models/config live on EFS at LAMBDA_LAYER_DIR (/mnt/models).
 # Locally: fall back to the vendored submodule at lambda/vendor/ndlocr-lite/src.
 _HANDLER_DIR = os.path.dirname(__file__)
 _VENDOR_SRC = os.path.join(_HANDLER_DIR, "vendor", "ndlocr-lite", "src")
 
 _LAYER_DIR = os.environ.get("LAMBDA_LAYER_DIR", "")
 if _LAYER_DIR and os.path.isdir(os.path.join(_LAYER_DIR, "src")):
-    # Running on Lambda — use layer paths
+    # Running on Lambda — use EFS paths
     _SRC_DIR = os.path.join(_LAYER_DIR, "src")
     _MODEL_DIR = os.path.join(_LAYER_DIR, "model")
     _CONFIG_DIR = os.path.join(_LAYER_DIR, "config")
@@ -38,41 +43,96 @@ else:
 
 os.environ["NDLOCR_SRC_DIR"] = _SRC_DIR
 
-from ocr_engine import load_detector, load_recognizer, process_single_image
+from ocr_engine import (
+    load_detector,
+    load_recognizer,
+    process_single_image,
+    recognizer_model_path,
+    tuned_sessions,
+    warm_up,
+)
 from input_parser import parse_input
+from metrics import emit_metrics
+import result_cache
 
-# Load character vocabulary
-_charlist_path = os.path.join(_CONFIG_DIR, "NDLmoji.yaml")
-with open(_charlist_path, encoding="utf-8") as _f:
-    _charobj = safe_load(_f)
-_charlist: list[str] = list(_charobj["model"]["charset_train"])
 
-# Load detector (DEIM)
-detector = load_detector(
-    model_path=os.path.join(_MODEL_DIR, "deim-s-1024x1024.onnx"),
-    class_mapping_path=os.path.join(_CONFIG_DIR, "ndl.yaml"),
-)
+def _load_charlist(path: str) -> list[str]:
+    """Load the recognizer vocabulary from the JSON cache or NDLmoji.yaml.
 
-# Load 3 PARSeq recognizers
-recognizer30 = load_recognizer(
-    model_path=os.path.join(
-        _MODEL_DIR, "parseq-ndl-16x256-30-tiny-192epoch-tegaki3.onnx"
-    ),
-    charlist=_charlist,
-)
-recognizer50 = load_recognizer(
-    model_path=os.path.join(
-        _MODEL_DIR, "parseq-ndl-16x384-50-tiny-146epoch-tegaki2.onnx"
-    ),
-    charlist=_charlist,
-)
-recognizer100 = load_recognizer(
-    model_path=os.path.join(
-        _MODEL_DIR, "parseq-ndl-16x768-100-tiny-165epoch-tegaki2.onnx"
-    ),
-    charlist=_charlist,
+    PyYAML is imported only on the YAML path, keeping it off the cold start
+    when the EFS provisioner has written the JSON cache.
+    """
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    from yaml import safe_load
+
+    with open(path, encoding="utf-8") as f:
+        return list(safe_load(f)["model"]["charset_train"])
+
+
+# INT8 recognizers are produced by the EFS provisioner when enabled at deploy time.
+_QUANTIZE_RECOGNIZERS = os.environ.get("QUANTIZE_RECOGNIZERS", "0") == "1"
+
+
+# Load character vocabulary (JSON cache written by the EFS provisioner, or
+# the vendored YAML when running locally).
+_charset_cache_path = os.path.join(_CONFIG_DIR, "NDLmoji.charset.json")
+_charlist: list[str] = _load_charlist(
+    _charset_cache_path
+    if os.path.exists(_charset_cache_path)
+    else os.path.join(_CONFIG_DIR, "NDLmoji.yaml")
 )
 
+# Load detector (DEIM) and 3 PARSeq recognizers concurrently. Each load is
+# dominated by the EFS read and ONNX Runtime session construction, which
+# release the GIL, so the total is bounded by the slowest model.
+# tuned_sessions() pins ORT threads to the Lambda vCPUs and shares one CPU
+# arena across the 4 sessions instead of each allocating its own.
+with tuned_sessions(), ThreadPoolExecutor(max_workers=4) as _pool:
+    _detector_future = _pool.submit(
+        load_detector,
+        model_path=os.path.join(_MODEL_DIR, "deim-s-1024x1024.onnx"),
+        class_mapping_path=os.path.join(_CONFIG_DIR, "ndl.yaml"),
+    )
+    _recognizer30_future = _pool.submit(
+        load_recognizer,
+        model_path=recognizer_model_path(
+            _MODEL_DIR,
+            "parseq-ndl-16x256-30-tiny-192epoch-tegaki3.onnx",
+            quantize=_QUANTIZE_RECOGNIZERS,
+        ),
+        charlist=_charlist,
+    )
+    _recognizer50_future = _pool.submit(
+        load_recognizer,
+        model_path=recognizer_model_path(
+            _MODEL_DIR,
+            "parseq-ndl-16x384-50-tiny-146epoch-tegaki2.onnx",
+            quantize=_QUANTIZE_RECOGNIZERS,
+        ),
+        charlist=_charlist,
+    )
+    _recognizer100_future = _pool.submit(
+        load_recognizer,
+        model_path=recognizer_model_path(
+            _MODEL_DIR,
+            "parseq-ndl-16x768-100-tiny-165epoch-tegaki2.onnx",
+            quantize=_QUANTIZE_RECOGNIZERS,
+        ),
+        charlist=_charlist,
+    )
+
+    detector = _detector_future.result()
+    recognizer30 = _recognizer30_future.result()
+    recognizer50 = _recognizer50_future.result()
+    recognizer100 = _recognizer100_future.result()
+
+    # One dummy forward pass per session moves first-Run allocation into
+    # init, which provisioned concurrency pays before any request arrives.
+    list(_pool.map(warm_up, [detector, recognizer30, recognizer50, recognizer100]))
+
 
 # ---------------------------------------------------------------------------
 # Handler (called per invocation)
@@ -80,7 +140,21 @@ recognizer100 = load_recognizer(
 
 
 _BUCKET_NAME = os.environ.get("IMAGE_BUCKET", "")
-_s3_client = boto3.client("s3") if _BUCKET_NAME else None
+# Presigning is local (no network call), but SigV4 + virtual-hosted URLs avoid
+# the regional redirect that path-style/legacy-signed PUTs hit outside us-east-1.
+_s3_client = (
+    boto3.client(
+        "s3",
+        config=Config(
+            signature_version="s3v4",
+            s3={"addressing_style": "virtual"},
+            retries={"max_attempts": 2},
+            tcp_keepalive=True,
+        ),
+    )
+    if _BUCKET_NAME
+    else None
+)
 
 
 def _handle_get_upload_url(event: dict[str, Any]) -> dict[str, Any]:
@@ -109,24 +183,47 @@ def _handle_get_upload_url(event: dict[str, Any]) -> dict[str, Any]:
 
 def _handle_ocr(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """Run OCR on the provided image or PDF."""
-    request_id: str = getattr(context, "aws_request_id", None) or "local"
-    work_dir = os.path.join("/tmp", request_id)
-
     try:
-        image_paths, is_pdf = parse_input(event, work_dir)
+        cache_key, etag = result_cache.cache_key(event)
+        if cache_key:
+            cached_pages = result_cache.get(cache_key)
+            if cached_pages is not None:
+                return {
+                    "statusCode": 200,
+                    "body": {"pages": cached_pages},
+                }
+
+        images, is_pdf = parse_input(event, etag)
+        if is_pdf:
+            # pdf_utils (and pypdfium2) is already loaded by parse_input for PDFs
+            from pdf_utils import prefetch
+
+            images = prefetch(images)
 
         pages: list[dict] = []
-        for page_num, img_path in enumerate(image_paths, start=1):
-            if not os.path.exists(img_path):
-                raise RuntimeError(
-                    f"Expected image file not found: {os.path.basename(img_path)}"
+        try:
+            for page_num, img in enumerate(images, start=1):
+                result = process_single_image(
+                    img,
+                    detector,
+                    recognizer30,
+                    recognizer50,
+                    recognizer100,
+                    imgname=f"page_{page_num:03d}.jpg",
                 )
+                result["page"] = page_num
+                pages.append(result)
+        finally:
+            if is_pdf:
+                images.close()  # stop the prefetch thread on early exit
+
+        if cache_key:
+            result_cache.put(cache_key, pages)
 
-            result = process_single_image(
-                img_path, detector, recognizer30, recognizer50, recognizer100
-            )
-            result["page"] = page_num
-            pages.append(result)
+        emit_metrics(
+            Pages=len(pages),
+            EmptyPages=sum(1 for page in pages if not page["contents"]),
+        )
 
         return {
             "statusCode": 200,
@@ -139,22 +236,23 @@ def _handle_ocr(event: dict[str, Any], context: Any) -> dict[str, Any]:
             "body": {"error": str(e)},
         }
     except Exception as e:
-        traceback.print_exc()
+        # Text log format prints only the message; the runtime adds the request id
+        logger.exception("OCR failed (event keys: %s)", sorted(event))
         return {
             "statusCode": 500,
             "body": {"error": f"Internal error: {type(e).__name__}: {e!s}"},
         }
-    finally:
-        if os.path.exists(work_dir):
-            shutil.rmtree(work_dir, ignore_errors=True)
 
 
 def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
     """Lambda entry point. Routes between OCR and upload URL tools.
 
+    If event has "warmup" → return immediately (keep-warm schedule).
     If event has "filename" → generate presigned upload URL.
     If event has "image" → run OCR.
     """
+    if event.get("warmup"):
+        return {"statusCode": 200, "body": {"warm": True}}
     if "filename" in event:
         return _handle_get_upload_url(event)
     return _handle_ocr(event, context)
@@ -4,13 +4,22 @@ from __future__ import annotations
 
 import base64
 import io
-import os
-import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
 
 import boto3
+import numpy as np
+from botocore.config import Config
+from botocore.exceptions import ClientError
 from PIL import Image
 
-s3_client = boto3.client("s3")
+# Objects larger than one part are fetched with parallel ranged GETs
+_S3_PART_SIZE = 8 * 1024 * 1024
+_S3_MAX_CONCURRENCY = 8
+
+s3_client = boto3.client(
+    "s3", config=Config(max_pool_connections=2 * _S3_MAX_CONCURRENCY)
+)
 
 
 def parse_pages(pages_str: str | None, total_pages: int) -> list[int]:
@@ -21,50 +30,98 @@ def parse_pages(pages_str: str | None, total_pages: int) -> list[int]:
     if not pages_str:
         return list(range(total_pages))
 
-    indices: set[int] = set()
-    for part in pages_str.split(","):
+    raw_parts = pages_str.split(",")
+    if len(raw_parts) == 1 and "-" in raw_parts[0]:
+        start_str, end_str = raw_parts[0].split("-", 1)
+        # A single range covering every page ("1-N") needs no dedupe or sort
+        if int(start_str.strip()) <= 1 and int(end_str.strip()) >= total_pages:
+            return list(range(total_pages))
+
+    parts: list[np.ndarray] = []
+    for part in raw_parts:
         part = part.strip()
         if "-" in part:
             start_str, end_str = part.split("-", 1)
-            start = int(start_str.strip())
-            end = int(end_str.strip())
-            for p in range(start, end + 1):
-                if 1 <= p <= total_pages:
-                    indices.add(p - 1)
+            # Clamp before materialising so huge ranges stay cheap
+            start = max(int(start_str.strip()), 1)
+            end = min(int(end_str.strip()), total_pages)
+            parts.append(np.arange(start - 1, end, dtype=np.int64))
         else:
             p = int(part)
             if 1 <= p <= total_pages:
-                indices.add(p - 1)
-
-    return sorted(indices)
-
+                parts.append(np.array([p - 1], dtype=np.int64))
 
-def _is_pdf(data: bytes) -> bool:
-    """Check if data starts with PDF magic bytes."""
-    return data[:5] == b"%PDF-"
+    if not parts:
+        return []
+    return np.unique(np.concatenate(parts)).tolist()
 
 
-def _is_s3_uri(image_str: str) -> bool:
-    """Check if a string is an S3 URI."""
-    return image_str.startswith("s3://")
-
-
-def _download_s3(uri: str, dest_path: str) -> None:
-    """Download an S3 object to a local file."""
-    match = re.match(r"s3://([^/]+)/(.+)", uri)
-    if not match:
+def split_s3_uri(uri: str) -> tuple[str, str]:
+    """Split 's3://bucket/key' into (bucket, key)."""
+    bucket, _, key = uri.removeprefix("s3://").partition("/")
+    if not bucket or not key:
         raise ValueError(f"Invalid S3 URI: {uri}")
-    bucket, key = match.group(1), match.group(2)
-    s3_client.download_file(bucket, key, dest_path)
-
+    return bucket, key
 
-def parse_input(event: dict, work_dir: str) -> tuple[list[str], bool]:
-    """Parse the Lambda event and return (image_paths, is_pdf).
 
-    For images: returns a single-element list with the image path.
-    For PDFs: returns list of rendered page image paths.
+def _fetch_s3(uri: str, etag: str | None = None) -> bytes:
+    """Read an S3 object into memory.
 
-    All files are written into work_dir.
+    The first part is a ranged GET whose Content-Range reveals the object
+    size, so small objects still take a single request. Remaining parts are
+    fetched in parallel, pinned to the first part's ETag. When `etag` is
+    given, the first GET is pinned to it too.
+    """
+    bucket, key = split_s3_uri(uri)
+    pinned = {"IfMatch": etag} if etag else {}
+    try:
+        first = s3_client.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes=0-{_S3_PART_SIZE - 1}", **pinned
+        )
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code")
+        if code == "PreconditionFailed":
+            raise ValueError(f"S3 object changed while reading: {uri}")
+        if code != "InvalidRange":
+            raise
+        return b""  # Zero-byte object: no range is satisfiable
+    head = first["Body"].read()
+    total = int(first["ContentRange"].rpartition("/")[2])
+    if total <= _S3_PART_SIZE:
+        return head
+
+    def _get_part(start: int) -> bytes:
+        end = min(start + _S3_PART_SIZE, total) - 1
+        return s3_client.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", IfMatch=first["ETag"]
+        )["Body"].read()
+
+    with ThreadPoolExecutor(max_workers=_S3_MAX_CONCURRENCY) as pool:
+        try:
+            rest = list(
+                pool.map(_get_part, range(_S3_PART_SIZE, total, _S3_PART_SIZE))
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "PreconditionFailed":
+                raise ValueError(f"S3 object changed while reading: {uri}")
+            raise
+    return b"".join([head, *rest])
+
+
+def parse_input(
+    event: dict, etag: str | None = None
+) -> tuple[Iterator[np.ndarray], bool]:
+    """Parse the Lambda event and return (images, is_pdf).
+
+    `etag` pins an s3:// read to that object version (see result_cache).
+
+    For images: yields the single decoded image.
+    For PDFs: yields rendered pages lazily, one per iteration.
+
+    Input validation, image decoding, opening the PDF and parsing `pages`
+    all happen here, so those errors raise before iteration; only per-page
+    PDF rendering is deferred.
+    Images are H×W×3 uint8 RGB arrays; nothing is written to disk.
     """
     image_str = event.get("image")
     if not image_str:
@@ -72,38 +129,48 @@ def parse_input(event: dict, work_dir: str) -> tuple[list[str], bool]:
 
     pages_param: str | None = event.get("pages")
 
-    os.makedirs(work_dir, exist_ok=True)
-
-    if _is_s3_uri(image_str):
-        tmp_file = os.path.join(work_dir, "input_file")
-        _download_s3(image_str, tmp_file)
-        with open(tmp_file, "rb") as f:
-            data = f.read()
+    if image_str.startswith("s3://"):
+        data = _fetch_s3(image_str, etag)
     else:
         try:
             data = base64.b64decode(image_str)
         except Exception as e:
             raise ValueError(f"Failed to decode base64 image data: {e}")
 
-    if _is_pdf(data):
-        return _render_pdf(data, work_dir, pages_param), True
+    if data.startswith(b"%PDF-"):  # PDF magic bytes
+        return _render_pdf(data, pages_param), True
     else:
-        img_path = os.path.join(work_dir, "page_001.jpg")
-        _save_image(data, img_path)
-        return [img_path], False
+        return iter([_decode_image(data)]), False
+
+
+def _sniff_image_format(data: bytes) -> str | None:
+    """Return the PIL format name for common image magic bytes, or None."""
+    if data.startswith(b"\xff\xd8\xff"):
+        return "JPEG"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "PNG"
+    if data.startswith(b"RIFF") and data[8:12] == b"WEBP":
+        return "WEBP"
+    return None
 
 
-def _save_image(data: bytes, path: str) -> None:
-    """Save raw image bytes as a JPEG file."""
+def _decode_image(data: bytes) -> np.ndarray:
+    """Decode raw image bytes into an RGB array."""
+    # A known format makes PIL open with that one plugin instead of probing all
+    fmt = _sniff_image_format(data)
     try:
-        img = Image.open(io.BytesIO(data)).convert("RGB")
+        img = Image.open(io.BytesIO(data), formats=[fmt] if fmt else None)
+        img.load()
+        if img.mode != "RGB":
+            img = img.convert("RGB")
     except Exception as e:
         raise ValueError(f"Cannot decode image data: {e}")
-    img.save(path, "JPEG")
+    # asarray wraps PIL's exported buffer (read-only) instead of copying it again
+    return np.asarray(img)
 
 
-def _render_pdf(data: bytes, work_dir: str, pages_param: str | None) -> list[str]:
-    """Render PDF pages to JPEG images using pypdfium2."""
+def _render_pdf(data: bytes, pages_param: str | None) -> Iterator[np.ndarray]:
+    """Render PDF pages to RGB arrays using pypdfium2."""
     import pdf_utils
 
-    return pdf_utils.render_pdf_pages(data, work_dir, pages_param)
+    return pdf_utils.render_pdf_pages(data, pages_param)
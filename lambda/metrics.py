@@ -0,0 +1,25 @@
+"""CloudWatch Embedded Metric Format (EMF) counters, written to stdout."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+NAMESPACE = "NDLOCR"
+
+
+def emit_metrics(**counts: int) -> None:
+    """Publish counters via CloudWatch Embedded Metric Format (a stdout line, no API call)."""
+    print(json.dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": NAMESPACE,
+                "Dimensions": [["FunctionName"]],
+                "Metrics": [{"Name": name, "Unit": "Count"} for name in counts],
+            }],
+        },
+        "FunctionName": os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "local"),
+        **counts,
+    }))
@@ -7,15 +7,19 @@ model objects — avoiding the per-invocation model reload that process() does.
 
 from __future__ import annotations
 
+import contextlib
+import functools
+import logging
 import os
 import sys
 import xml.etree.ElementTree as ET
-from typing import Any
+from typing import Any, Iterator
 
 import numpy as np
-from PIL import Image
 
-# NDL-OCR Lite source: Lambda Layer at /opt/src, or vendored submodule for local dev.
+logger = logging.getLogger(__name__)
+
+# NDL-OCR Lite source: EFS at /mnt/models/src, or vendored submodule for local dev.
 _SRC_DIR = os.environ.get(
     "NDLOCR_SRC_DIR",
     os.path.join(os.path.dirname(__file__), "vendor", "ndlocr-lite", "src"),
@@ -27,15 +31,95 @@ if _SRC_DIR not in sys.path:
 sys.setrecursionlimit(5000)
 
 
-def _import_ndlocr() -> tuple:
-    """Lazy-import NDL-OCR Lite modules. Returns (DEIM, PARSEQ, RecogLine, process_cascade, convert_to_xml_string3, eval_xml)."""
+@functools.cache
+def _get_deim() -> type:
+    """Lazy-import NDL-OCR Lite's DEIM detector class."""
     from deim import DEIM
+
+    return DEIM
+
+
+@functools.cache
+def _get_parseq() -> type:
+    """Lazy-import NDL-OCR Lite's PARSeq recognizer class."""
     from parseq import PARSEQ
+
+    return PARSEQ
+
+
+@functools.cache
+def _get_recog_helpers() -> tuple:
+    """Lazy-import the per-page pipeline helpers once per process.
+
+    Returns (RecogLine, process_cascade, convert_to_xml_string3, eval_xml).
+    """
     from ocr import RecogLine, process_cascade
     from ndl_parser import convert_to_xml_string3
     from reading_order.xy_cut.eval import eval_xml
 
-    return DEIM, PARSEQ, RecogLine, process_cascade, convert_to_xml_string3, eval_xml
+    return RecogLine, process_cascade, convert_to_xml_string3, eval_xml
+
+
+def _session_options(sess_options: Any = None) -> Any:
+    """Tune SessionOptions for Lambda: threads pinned to vCPUs, shared CPU arena.
+
+    Each of the four sessions gets an intra-op pool sized to all vCPUs (3 at
+    5120 MB). That is 4x the vCPU count in threads, but the pipeline runs one
+    session at a time per invocation (Lambda serves one request per
+    environment), so only one pool is busy. Spinning is disabled so the idle
+    pools sleep instead of busy-waiting on the vCPUs the active one needs.
+    inter_op stays 1: the graphs are sequential and would gain nothing.
+
+    Options passed by NDL-OCR Lite are tuned in place so its own graph
+    optimization level is kept; otherwise ORT_ENABLE_ALL is used.
+    """
+    import onnxruntime
+
+    if sess_options is None:
+        sess_options = onnxruntime.SessionOptions()
+        sess_options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+    sess_options.enable_mem_pattern = True
+    sess_options.enable_cpu_mem_arena = True
+    sess_options.intra_op_num_threads = max(1, os.cpu_count() or 2)
+    sess_options.inter_op_num_threads = 1
+    sess_options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+    sess_options.add_session_config_entry("session.use_env_allocators", "1")
+    return sess_options
+
+
+@contextlib.contextmanager
+def tuned_sessions() -> Iterator[None]:
+    """Apply _session_options() to ONNX sessions created inside this block.
+
+    DEIM and PARSEQ construct their InferenceSession internally, so the
+    constructor is wrapped for the duration of model loading. A single CPU
+    arena allocator is registered once and shared by all sessions.
+    Not reentrant: wrap all load_detector/load_recognizer calls in one block.
+    """
+    import onnxruntime
+
+    onnxruntime.create_and_register_allocator(
+        onnxruntime.OrtMemoryInfo(
+            "Cpu",
+            onnxruntime.OrtAllocatorType.ORT_ARENA_ALLOCATOR,
+            0,
+            onnxruntime.OrtMemType.DEFAULT,
+        ),
+        onnxruntime.OrtArenaCfg(0, -1, -1, -1),
+    )
+
+    original = onnxruntime.InferenceSession
+
+    def _tuned_session(path_or_bytes, sess_options=None, *args, **kwargs):
+        return original(path_or_bytes, _session_options(sess_options), *args, **kwargs)
+
+    onnxruntime.InferenceSession = _tuned_session
+    try:
+        yield
+    finally:
+        onnxruntime.InferenceSession = original
 
 
 def load_detector(
@@ -47,9 +131,13 @@ def load_detector(
     iou_threshold: float = 0.2,
     device: str = "cpu",
 ) -> Any:
-    """Load the DEIM layout detector."""
-    DEIM = _import_ndlocr()[0]
-    return DEIM(
+    """Load the DEIM layout detector.
+
+    The class-name list passed to convert_to_xml_string3 is built once here
+    and attached as detector._classeslist.
+    """
+    DEIM = _get_deim()
+    detector = DEIM(
         model_path=model_path,
         class_mapping_path=class_mapping_path,
         score_threshold=score_threshold,
@@ -57,76 +145,159 @@ def load_detector(
         iou_threshold=iou_threshold,
         device=device,
     )
+    detector._classeslist = list(detector.classes.values())
+    return detector
+
+
+def recognizer_model_path(model_dir: str, filename: str, *, quantize: bool) -> str:
+    """Resolve a PARSeq model path, preferring its INT8 copy when quantize is set.
+
+    The provisioner writes <name>.int8.onnx next to each recognizer; if that
+    file is missing (e.g. EFS not yet re-provisioned) the FP32 model is used.
+    """
+    path = os.path.join(model_dir, filename)
+    root, ext = os.path.splitext(path)
+    quantized = f"{root}.int8{ext}"
+    if quantize and os.path.exists(quantized):
+        return quantized
+    return path
 
 
 def load_recognizer(model_path: str, charlist: list[str], device: str = "cpu") -> Any:
     """Load a PARSeq text recognizer."""
-    PARSEQ = _import_ndlocr()[1]
+    PARSEQ = _get_parseq()
     return PARSEQ(model_path=model_path, charlist=charlist, device=device)
 
 
+_ORT_DTYPES = {
+    "tensor(float)": np.float32,
+    "tensor(float16)": np.float16,
+    "tensor(int64)": np.int64,
+    "tensor(int32)": np.int32,
+}
+
+
+def warm_up(model: Any) -> None:
+    """Run one zero-input forward pass so the first request skips ORT's first-Run cost.
+
+    Input names, shapes, and dtypes are read from the session; dynamic
+    dimensions are set to 1. Failures are logged and ignored so an
+    unexpected model signature never blocks initialization.
+    """
+    session = getattr(model, "session", None)
+    if session is None:
+        return
+    try:
+        feeds = {
+            inp.name: np.zeros(
+                [d if isinstance(d, int) and d > 0 else 1 for d in inp.shape],
+                dtype=_ORT_DTYPES.get(inp.type, np.float32),
+            )
+            for inp in session.get_inputs()
+        }
+        session.run(None, feeds)
+    except Exception:
+        logger.warning("Warm-up run failed for %s", type(model).__name__, exc_info=True)
+
+
 def process_single_image(
-    img_path: str,
+    img: np.ndarray,
     detector: Any,
     recognizer30: Any,
     recognizer50: Any,
     recognizer100: Any,
+    *,
+    imgname: str = "page_001.jpg",
 ) -> dict:
-    """Run the full OCR pipeline on a single image using pre-loaded models.
+    """Run the full OCR pipeline on a single RGB image using pre-loaded models.
+
+    detector must come from load_detector().
 
+    imgname is only recorded in the intermediate layout XML.
     Returns the per-page result dict with text, imginfo, and contents.
     """
-    _, _, RecogLine, process_cascade, convert_to_xml_string3, eval_xml = _import_ndlocr()
+    RecogLine, process_cascade, convert_to_xml_string3, eval_xml = _get_recog_helpers()
 
-    pil_image = Image.open(img_path).convert("RGB")
-    img = np.array(pil_image)
     img_h, img_w = img.shape[:2]
-    imgname = os.path.basename(img_path)
 
     # Step 1: Layout detection
     detections: list[dict] = detector.detect(img)
-    classeslist: list[str] = list(detector.classes.values())
+    if not detections:
+        # Blank page: skip XML assembly, reading order, and all recognizers
+        return {
+            "text": "",
+            "imginfo": {
+                "img_width": img_w,
+                "img_height": img_h,
+            },
+            "contents": [],
+        }
+    classeslist: list[str] = detector._classeslist
 
     # Step 2: Build detection result structure expected by convert_to_xml_string3
-    resultobj: list[dict] = [dict(), dict()]
-    resultobj[0][0] = list()
-    for i in range(17):
-        resultobj[1][i] = []
+    # (appends go to plain lists; the dict shape is only built for the call)
+    boxes_class0: list[list] = []
+    boxes_by_class: list[list] = [[] for _ in range(17)]
     for det in detections:
         xmin, ymin, xmax, ymax = det["box"]
-        conf = det["confidence"]
-        if det["class_index"] == 0:
-            resultobj[0][0].append([xmin, ymin, xmax, ymax])
-        resultobj[1][det["class_index"]].append([xmin, ymin, xmax, ymax, conf])
+        class_index = det["class_index"]
+        if class_index == 0:
+            boxes_class0.append([xmin, ymin, xmax, ymax])
+        boxes_by_class[class_index].append([xmin, ymin, xmax, ymax, det["confidence"]])
+    resultobj: list[dict] = [{0: boxes_class0}, dict(enumerate(boxes_by_class))]
 
     # Step 3: XML assembly + reading order
     xmlstr = convert_to_xml_string3(img_w, img_h, imgname, classeslist, resultobj)
-    xmlstr = "<OCRDATASET>" + xmlstr + "</OCRDATASET>"
-    root = ET.fromstring(xmlstr)
+    # Feed the wrapper and page markup separately instead of concatenating
+    parser = ET.XMLParser()
+    parser.feed("<OCRDATASET>")
+    parser.feed(xmlstr)
+    parser.feed("</OCRDATASET>")
+    root = parser.close()
     eval_xml(root, logger=None)
 
-    # Step 4: Extract line images for recognition
-    alllineobj: list = []
+    # Step 4: Extract line images for recognition (single pass over the XML;
+    # boxes and confidences are kept for Step 6)
+    line_boxes: list[tuple[int, int, int, int, float]] = []
+    pred_char_cnts: list[float] = []
     tatelinecnt = 0
     alllinecnt = 0
 
-    for idx, lineobj in enumerate(root.findall(".//LINE")):
-        xmin = int(lineobj.get("X"))
-        ymin = int(lineobj.get("Y"))
-        line_w = int(lineobj.get("WIDTH"))
-        line_h = int(lineobj.get("HEIGHT"))
+    for lineobj in root.iter("LINE"):
+        attrib = lineobj.attrib
+        xmin = int(attrib["X"])
+        ymin = int(attrib["Y"])
+        line_w = int(attrib["WIDTH"])
+        line_h = int(attrib["HEIGHT"])
         try:
-            pred_char_cnt = float(lineobj.get("PRED_CHAR_CNT"))
+            pred_char_cnt = float(attrib.get("PRED_CHAR_CNT"))
         except (TypeError, ValueError):
             pred_char_cnt = 100.0
+        try:
+            conf = float(attrib.get("CONF"))
+        except (TypeError, ValueError):
+            conf = 0
+        line_boxes.append((xmin, ymin, line_w, line_h, conf))
+        pred_char_cnts.append(pred_char_cnt)
 
         if line_h > line_w:
             tatelinecnt += 1
         alllinecnt += 1
 
-        lineimg = img[ymin : ymin + line_h, xmin : xmin + line_w, :]
-        linerecogobj = RecogLine(lineimg, idx, pred_char_cnt)
-        alllineobj.append(linerecogobj)
+    # Clip all crop windows to the image in one shot (a negative origin would
+    # otherwise slice from the far edge), then hand PARSeq contiguous crops.
+    alllineobj: list = []
+    if line_boxes:
+        boxes = np.array([box[:4] for box in line_boxes], dtype=np.int64)
+        x0 = np.clip(boxes[:, 0], 0, img_w)
+        y0 = np.clip(boxes[:, 1], 0, img_h)
+        x1 = np.clip(boxes[:, 0] + boxes[:, 2], 0, img_w)
+        y1 = np.clip(boxes[:, 1] + boxes[:, 3], 0, img_h)
+        for idx, (xa, ya, xb, yb) in enumerate(
+            zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist())
+        ):
+            lineimg = np.ascontiguousarray(img[ya:yb, xa:xb, :])
+            alllineobj.append(RecogLine(lineimg, idx, pred_char_cnts[idx]))
 
     # Step 5: Text recognition via cascade
     if alllineobj:
@@ -138,16 +309,7 @@ def process_single_image(
 
     # Step 6: Assemble JSON result
     resjsonarray: list[dict] = []
-    for idx, lineobj in enumerate(root.findall(".//LINE")):
-        xmin = int(lineobj.get("X"))
-        ymin = int(lineobj.get("Y"))
-        line_w = int(lineobj.get("WIDTH"))
-        line_h = int(lineobj.get("HEIGHT"))
-        try:
-            conf = float(lineobj.get("CONF"))
-        except (TypeError, ValueError):
-            conf = 0
-
+    for idx, (xmin, ymin, line_w, line_h, conf) in enumerate(line_boxes):
         text = resultlinesall[idx] if idx < len(resultlinesall) else ""
         jsonobj: dict = {
             "boundingBox": [
@@ -2,38 +2,106 @@
 
 from __future__ import annotations
 
-import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, TypeVar
 
+import numpy as np
 import pypdfium2 as pdfium
 
 from input_parser import parse_pages
 
 
 def render_pdf_pages(
-    pdf_data: bytes, work_dir: str, pages_param: str | None = None
-) -> list[str]:
-    """Render selected PDF pages to JPEG images.
+    pdf_data: bytes, pages_param: str | None = None
+) -> Iterator[np.ndarray]:
+    """Render selected PDF pages to RGB images in memory, one page at a time.
+
+    The document is opened and the page selection parsed before this
+    returns, so a corrupt PDF or a malformed `pages` raises ValueError
+    here rather than on first iteration (which may run on another thread).
 
     Args:
         pdf_data: Raw PDF file bytes.
-        work_dir: Directory to write page images into.
         pages_param: Page selection string (e.g. '1-3', '1,3,5'). None = all pages.
 
     Returns:
-        List of paths to rendered JPEG images, in page order.
+        Iterator of H×W×3 uint8 RGB arrays, in page order.
+    """
+    try:
+        pdf = pdfium.PdfDocument(pdf_data)
+    except pdfium.PdfiumError as e:
+        raise ValueError(f"Cannot open PDF: {e}")
+    try:
+        indices = parse_pages(pages_param, len(pdf))
+    except Exception:
+        pdf.close()
+        raise
+    return _render_pages(pdf, indices)
+
+
+def _render_pages(pdf: pdfium.PdfDocument, indices: list[int]) -> Iterator[np.ndarray]:
+    """Yield the given pages of an open document, closing it when done."""
+    try:
+        for idx in indices:
+            page = pdf[idx]
+            # rev_byteorder yields RGB instead of pdfium's native BGR.
+            # new_native renders into a packed ctypes buffer owned by Python;
+            # the numpy view keeps it alive, so no copy is needed.
+            bitmap = page.render(
+                scale=300 / 72,  # 300 DPI
+                rev_byteorder=True,
+                bitmap_maker=pdfium.PdfBitmap.new_native,
+            )
+            yield bitmap.to_numpy()
+    finally:
+        pdf.close()
+
+
+_T = TypeVar("_T")
+_END = object()
+
+
+def prefetch(items: Iterator[_T], depth: int = 2) -> Iterator[_T]:
+    """Yield from items while a background thread produces the next ones.
+
+    Used for PDFs so rasterizing page N+1 overlaps OCR of page N (ONNX
+    inference releases the GIL). At most `depth` pages are buffered.
+    Producer exceptions are re-raised in the consumer; closing the
+    generator stops the producer.
     """
-    pdf = pdfium.PdfDocument(pdf_data)
-    total_pages = len(pdf)
-    page_indices = parse_pages(pages_param, total_pages)
-
-    image_paths: list[str] = []
-    for idx in page_indices:
-        page = pdf[idx]
-        bitmap = page.render(scale=300 / 72)  # 300 DPI
-        pil_img = bitmap.to_pil().convert("RGB")
-        img_path = os.path.join(work_dir, f"page_{idx + 1:03d}.jpg")
-        pil_img.save(img_path, "JPEG")
-        image_paths.append(img_path)
-
-    pdf.close()
-    return image_paths
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def _put(entry: tuple) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for item in items:
+                if not _put((item, None)):
+                    return
+        except Exception as e:
+            _put((_END, e))
+        else:
+            _put((_END, None))
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(_produce)
+        try:
+            while True:
+                item, error = buffer.get()
+                if error is not None:
+                    raise error
+                if item is _END:
+                    return
+                yield item
+        finally:
+            stop.set()
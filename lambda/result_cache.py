@@ -0,0 +1,90 @@
+"""OCR result cache for S3 inputs, keyed by object ETag and page selection.
+
+Retries and multi-agent chains often resubmit the same S3 object. A
+HeadObject plus a DynamoDB GetItem (~10ms) replaces the OCR pipeline on a
+hit. Disabled when RESULT_CACHE_TABLE is unset; cache errors never fail
+a request.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+
+from input_parser import s3_client, split_s3_uri
+
+logger = logging.getLogger(__name__)
+
+_TABLE_NAME = os.environ.get("RESULT_CACHE_TABLE", "")
+_TTL_SECONDS = 24 * 60 * 60  # matches the image bucket's 1-day lifecycle
+# DynamoDB items are capped at 400KB; larger results are simply not cached.
+_MAX_ITEM_BYTES = 350_000
+
+# OCR_ASSET_HASH covers the handler code and the vendored source, models and
+# config on EFS (set by the CDK stack); with the INT8 recognizer switch it
+# versions every cached result, so a deploy changing any of them misses.
+_MODEL_VERSION = (
+    f"{os.environ.get('OCR_ASSET_HASH', '')}"
+    f"-q{os.environ.get('QUANTIZE_RECOGNIZERS', '0')}"
+)
+
+_dynamodb = boto3.client("dynamodb") if _TABLE_NAME else None
+
+
+def cache_key(event: dict) -> tuple[str | None, str | None]:
+    """Return (cache key, ETag) for an S3 input, or (None, None) when caching does not apply.
+
+    The ETag should be passed on to parse_input so the object that is read
+    is the one the key was built from.
+    """
+    image_str = event.get("image")
+    if not _dynamodb or not image_str or not image_str.startswith("s3://"):
+        return None, None
+    try:
+        bucket, key = split_s3_uri(image_str)
+        etag = s3_client.head_object(Bucket=bucket, Key=key)["ETag"]
+    except (ValueError, BotoCoreError, ClientError):
+        # Let parse_input report invalid URIs and missing objects as usual
+        return None, None
+    object_version = etag.strip('"')
+    pages = event.get("pages") or ""
+    return f"{bucket}/{key}@{object_version}#{pages}|{_MODEL_VERSION}", etag
+
+
+def get(key: str) -> list[dict] | None:
+    """Return cached pages for key, or None on a miss."""
+    try:
+        item = _dynamodb.get_item(
+            TableName=_TABLE_NAME,
+            Key={"image_key": {"S": key}},
+        ).get("Item")
+    except (BotoCoreError, ClientError):
+        logger.warning("Result cache lookup failed", exc_info=True)
+        return None
+    # TTL deletion is lazy; expired items may still be returned
+    if not item or int(item["ttl"]["N"]) < time.time():
+        return None
+    return json.loads(item["pages"]["S"])
+
+
+def put(key: str, pages: list[dict]) -> None:
+    """Store pages under key with a 24h TTL (skipped if too large for DynamoDB)."""
+    payload = json.dumps(pages, ensure_ascii=False)
+    if len(payload.encode("utf-8")) > _MAX_ITEM_BYTES:
+        return
+    try:
+        _dynamodb.put_item(
+            TableName=_TABLE_NAME,
+            Item={
+                "image_key": {"S": key},
+                "pages": {"S": payload},
+                "ttl": {"N": str(int(time.time()) + _TTL_SECONDS)},
+            },
+        )
+    except (BotoCoreError, ClientError):
+        logger.warning("Result cache store failed", exc_info=True)
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import json
 import os
 import sys
+import uuid
+from collections import Counter, defaultdict
 from pathlib import Path
 
 import pytest
@@ -18,12 +21,59 @@ sys.path.insert(0, str(LAMBDA_DIR))
 os.environ.setdefault("NDLOCR_SRC_DIR", str(VENDOR_SRC))
 
 
+def _collection_rank(item: pytest.Item) -> int:
+    """0 = filesystem/schema checks, 1 = handler tests, 2 = CDK synth."""
+    if item.get_closest_marker("filesystem"):
+        return 0
+    group = item.get_closest_marker("xdist_group")
+    if group and (group.args[:1] or [group.kwargs.get("name")])[0] == "cdk":
+        return 2
+    return 1
+
+
+def pytest_collection_modifyitems(config, items) -> None:
+    """Run the sub-millisecond checks first and the seconds-long CDK synth last.
+
+    The sort is stable, so file/definition order is kept within each tier.
+    """
+    items.sort(key=_collection_rank)
+
+
+@pytest.fixture(scope="session")
+def tool_schema() -> list[dict]:
+    """Parsed cdk/schemas/ocr-tool-schema.json (MCP tool definitions)."""
+    return json.loads((LAMBDA_DIR.parent / "cdk" / "schemas" / "ocr-tool-schema.json").read_text())
+
+
+@pytest.fixture(scope="session")
+def handler_src() -> str:
+    """Source text of lambda/handler.py, read once."""
+    return (LAMBDA_DIR / "handler.py").read_text()
+
+
+@pytest.fixture(scope="session")
+def ocr_stack_src() -> str:
+    """Source text of cdk/stacks/ocr_lambda_stack.py, read once."""
+    return (LAMBDA_DIR.parent / "cdk" / "stacks" / "ocr_lambda_stack.py").read_text()
+
+
+@pytest.fixture(scope="session")
+def ocr_handler():
+    """handler.handler, imported once per session (loads all 4 ONNX models).
+
+    Only requested by tests marked requires_models.
+    """
+    import handler
+
+    return handler.handler
+
+
 @pytest.fixture
 def lambda_context():
     """Create a fake Lambda context object."""
 
     class FakeContext:
-        aws_request_id: str = "test-request-id-001"
+        aws_request_id: str = f"test-request-{uuid.uuid4().hex}"
         function_name: str = "ndl-ocr-lite"
         memory_limit_in_mb: int = 3008
 
@@ -31,3 +81,100 @@ def lambda_context():
             return 60000
 
     return FakeContext()
+
+
+@pytest.fixture(scope="session")
+def cdk_stacks() -> dict:
+    """Build every test stack in one CDK app, once per session.
+
+    CDK forbids adding constructs after an app's first synthesis, so the
+    Gateway stack is created here alongside the OCR stack it references
+    (None when agentcore-alpha is not installed).
+    """
+    import aws_cdk as cdk
+    from stacks.ocr_lambda_stack import OcrLambdaStack
+
+    app = cdk.App()
+    ocr = OcrLambdaStack(
+        app, "TestOcrLambda", stack_prefix="test-ocr",
+        lambda_memory_mb=3008, lambda_timeout_sec=60,
+        # Both opt-in; asserted by the concurrency/scaling tests
+        reserved_concurrency=20, provisioned_concurrency=1,
+    )
+    try:
+        from stacks.gateway_stack import GatewayStack
+    except ImportError:
+        gateway = None
+    else:
+        gateway = GatewayStack(
+            app, "TestGw", stack_prefix="test-ocr",
+            lambda_function=ocr.lambda_function,
+            lambda_alias=ocr.lambda_alias,
+        )
+    return {"ocr": ocr, "gw": gateway}
+
+
+@pytest.fixture(scope="session")
+def all_templates(cdk_stacks) -> dict:
+    """Synthesized templates for every test stack: {"ocr": ..., "gw": ... or None}."""
+    from aws_cdk import assertions
+
+    return {
+        name: assertions.Template.from_stack(stack) if stack is not None else None
+        for name, stack in cdk_stacks.items()
+    }
+
+
+@pytest.fixture(scope="session")
+def ocr_stack_template(all_templates):
+    """Synthesized OcrLambdaStack template (read-only, shared by all tests)."""
+    return all_templates["ocr"]
+
+
+def _resources_by_type(template) -> dict[str, list[dict]]:
+    """Group resource Properties by CloudFormation type from one to_json() call."""
+    by_type: dict[str, list[dict]] = defaultdict(list)
+    for resource in template.to_json()["Resources"].values():
+        by_type[resource["Type"]].append(resource.get("Properties", {}))
+    return by_type
+
+
+@pytest.fixture(scope="session")
+def ocr_resources_by_type(ocr_stack_template) -> dict[str, list[dict]]:
+    """OCR stack resource Properties grouped by CloudFormation type.
+
+    Plain-dict asserts against this avoid a JSII round-trip per
+    has_resource_properties().
+    """
+    return _resources_by_type(ocr_stack_template)
+
+
+@pytest.fixture(scope="session")
+def gateway_resources_by_type(gateway_template) -> dict[str, list[dict]]:
+    """Gateway stack resource Properties grouped by CloudFormation type."""
+    return _resources_by_type(gateway_template)
+
+
+def _resource_counts(template) -> Counter:
+    """Count resources by CloudFormation type in one pass over the template."""
+    return Counter(r["Type"] for r in template.to_json()["Resources"].values())
+
+
+@pytest.fixture(scope="session")
+def ocr_resource_counts(ocr_stack_template) -> Counter:
+    """OCR stack resource counts keyed by CloudFormation type."""
+    return _resource_counts(ocr_stack_template)
+
+
+@pytest.fixture(scope="session")
+def gateway_resource_counts(gateway_template) -> Counter:
+    """Gateway stack resource counts keyed by CloudFormation type."""
+    return _resource_counts(gateway_template)
+
+
+@pytest.fixture(scope="session")
+def gateway_template(all_templates):
+    """Synthesized GatewayStack template, wired to the shared OCR stack."""
+    if all_templates["gw"] is None:
+        pytest.skip("aws-cdk agentcore-alpha not installed")
+    return all_templates["gw"]
@@ -22,3 +22,45 @@ requires_models = pytest.mark.skipif(
     not ((VENDOR_SRC / "model" / "deim-s-1024x1024.onnx").exists() and _has_onnxruntime()),
     reason="Skipped locally — runs in CodeBuild where onnxruntime and models are installed",
 )
+
+# Error-path tests import handler with ONNX sessions mocked: they need the
+# NDL-OCR Lite source and config, but no model weights are parsed.
+requires_vendor_src = pytest.mark.skipif(
+    not ((VENDOR_SRC / "deim.py").exists() and _has_onnxruntime()),
+    reason="Skipped locally — needs the vendor submodule and onnxruntime",
+)
+
+# Minimal blank-page PDFs (400x300pt pages, exact xref offsets) so PDF tests
+# need no PDFium document build. Verified to open and render in pypdfium2.
+BLANK_PDFS: dict[int, bytes] = {
+    2: (
+        b"%PDF-1.4\n"
+        b"1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+        b"2 0 obj<</Type/Pages/Kids[3 0 R 4 0 R]/Count 2>>endobj\n"
+        b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 400 300]>>endobj\n"
+        b"4 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 400 300]>>endobj\n"
+        b"xref\n0 5\n"
+        b"0000000000 65535 f \n"
+        b"0000000009 00000 n \n"
+        b"0000000052 00000 n \n"
+        b"0000000107 00000 n \n"
+        b"0000000170 00000 n \n"
+        b"trailer<</Size 5/Root 1 0 R>>\nstartxref\n233\n%%EOF\n"
+    ),
+    3: (
+        b"%PDF-1.4\n"
+        b"1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+        b"2 0 obj<</Type/Pages/Kids[3 0 R 4 0 R 5 0 R]/Count 3>>endobj\n"
+        b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 400 300]>>endobj\n"
+        b"4 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 400 300]>>endobj\n"
+        b"5 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 400 300]>>endobj\n"
+        b"xref\n0 6\n"
+        b"0000000000 65535 f \n"
+        b"0000000009 00000 n \n"
+        b"0000000052 00000 n \n"
+        b"0000000113 00000 n \n"
+        b"0000000176 00000 n \n"
+        b"0000000239 00000 n \n"
+        b"trailer<</Size 6/Root 1 0 R>>\nstartxref\n302\n%%EOF\n"
+    ),
+}
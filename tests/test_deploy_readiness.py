@@ -4,13 +4,12 @@ Verify that all components are wired correctly BEFORE deploying to AWS.
 These tests catch integration issues across boundaries:
   - Tool schema matches what handler.py accepts/returns
   - CDK stacks produce the right CloudFormation resources
-  - Gateway target routes to the Lambda alias (SnapStart)
+  - Gateway target routes to the Lambda alias
   - Vendor submodule has the files handler.py needs
 """
 
 from __future__ import annotations
 
-import json
 import re
 import sys
 from pathlib import Path
@@ -25,34 +24,27 @@ VENDOR_SRC = LAMBDA_DIR / "vendor" / "ndlocr-lite" / "src"
 
 sys.path.insert(0, str(CDK_DIR))
 
+_ONNX_REF_RE = re.compile(r'"([^"]+\.onnx)"')
+
 try:
-    import aws_cdk as cdk
     from aws_cdk import assertions
 
     CDK_AVAILABLE = True
 except ImportError:
     CDK_AVAILABLE = False
 
-try:
-    import aws_cdk.aws_bedrock_agentcore_alpha  # noqa: F401
-
-    AGENTCORE_AVAILABLE = True
-except ImportError:
-    AGENTCORE_AVAILABLE = False
-
 
 # ---------------------------------------------------------------------------
 # Tool schema ↔ handler contract
 # ---------------------------------------------------------------------------
 
 
+@pytest.mark.filesystem
 class TestToolSchemaContract:
     """MCP tool schema must match what handler.py reads from the event."""
 
-    def test_schema_input_matches_handler(self) -> None:
-        with open(SCHEMA_PATH) as f:
-            tools = json.load(f)
-
+    def test_schema_input_matches_handler(self, tool_schema) -> None:
+        tools = tool_schema
         assert isinstance(tools, list) and len(tools) >= 2
         tool_names = {t["name"] for t in tools}
         assert "ocr_extract_text" in tool_names
@@ -78,6 +70,7 @@ class TestToolSchemaContract:
 # ---------------------------------------------------------------------------
 
 
+@pytest.mark.filesystem
 class TestVendorFiles:
     """Vendor submodule and handler must agree on file names."""
 
@@ -92,9 +85,8 @@ class TestVendorFiles:
         for name in ["NDLmoji.yaml", "ndl.yaml"]:
             assert (VENDOR_SRC / "config" / name).exists(), f"Missing config: {name}"
 
-    def test_handler_model_paths_match_vendor(self) -> None:
-        handler_src = (LAMBDA_DIR / "handler.py").read_text()
-        onnx_refs = re.findall(r'"([^"]+\.onnx)"', handler_src)
+    def test_handler_model_paths_match_vendor(self, handler_src) -> None:
+        onnx_refs = _ONNX_REF_RE.findall(handler_src)
         assert len(onnx_refs) == 4, f"Expected 4 ONNX refs, got {len(onnx_refs)}"
         assert "NDLmoji.yaml" in handler_src
         assert "ndl.yaml" in handler_src
@@ -106,81 +98,230 @@ class TestVendorFiles:
 
 
 @pytest.mark.skipif(not CDK_AVAILABLE, reason="aws-cdk-lib not installed")
+@pytest.mark.xdist_group("cdk")  # one JSII process owns the shared synth
 class TestOcrLambdaStack:
     """Synthesized Lambda stack must have correct resource configuration."""
 
-    @pytest.fixture(scope="class")
-    def template(self):
-        from stacks.ocr_lambda_stack import OcrLambdaStack
-
-        app = cdk.App()
-        stack = OcrLambdaStack(
-            app, "TestOcrLambda", stack_prefix="test-ocr",
-            lambda_memory_mb=3008, lambda_timeout_sec=60,
+    @pytest.fixture
+    def template(self, ocr_stack_template):
+        return ocr_stack_template
+
+    @pytest.fixture
+    def by_type(self, ocr_resources_by_type):
+        return ocr_resources_by_type
+
+    @pytest.fixture
+    def counts(self, ocr_resource_counts):
+        return ocr_resource_counts
+
+    @staticmethod
+    def _ocr_function(by_type) -> dict:
+        """Properties of the OCR handler function."""
+        (props,) = [
+            p for p in by_type["AWS::Lambda::Function"]
+            if p.get("Handler") == "handler.handler"
+        ]
+        return props
+
+    def test_lambda_memory_and_timeout(self, template, by_type) -> None:
+        # Matcher smoke test; the rest of the class asserts on plain dicts
+        template.has_resource_properties(
+            "AWS::Lambda::Function", {"MemorySize": 3008},
         )
-        return assertions.Template.from_stack(stack)
+        props = self._ocr_function(by_type)
+        assert props["MemorySize"] == 3008
+        assert props["Timeout"] == 60
 
-    def test_lambda_memory_and_timeout(self, template) -> None:
+    def test_quantization_disabled_by_default(self, template) -> None:
+        """FP32 recognizers unless quantize_recognizers is opted into."""
         template.has_resource_properties(
             "AWS::Lambda::Function",
             {
-                "MemorySize": 3008,
-                "Timeout": 60,
+                "Handler": "handler.handler",
+                "Environment": {
+                    "Variables": assertions.Match.object_like(
+                        {"QUANTIZE_RECOGNIZERS": "0"}
+                    ),
+                },
             },
         )
+        template.has_resource_properties(
+            "AWS::CloudFormation::CustomResource",
+            {"QuantizeRecognizers": "false"},
+        )
 
-    def test_version_and_alias(self, template) -> None:
-        template.resource_count_is("AWS::Lambda::Version", 1)
-        template.resource_count_is("AWS::Lambda::Alias", 1)
+    def test_version_and_alias(self, by_type) -> None:
+        assert len(by_type["AWS::Lambda::Version"]) == 1
+        (alias,) = by_type["AWS::Lambda::Alias"]
+        assert alias["Name"] == "live"
+
+    def test_provisioned_concurrency(self, template) -> None:
+        """Alias keeps pre-initialized environments and scales on utilization."""
         template.has_resource_properties(
-            "AWS::Lambda::Alias", {"Name": "live"},
+            "AWS::Lambda::Alias",
+            {"ProvisionedConcurrencyConfig": {"ProvisionedConcurrentExecutions": 1}},
+        )
+        template.has_resource_properties(
+            "AWS::ApplicationAutoScaling::ScalableTarget",
+            {"MinCapacity": 1, "MaxCapacity": 5},
+        )
+        template.has_resource_properties(
+            "AWS::ApplicationAutoScaling::ScalingPolicy",
+            {
+                "TargetTrackingScalingPolicyConfiguration": assertions.Match.object_like(
+                    {"TargetValue": 0.7}
+                ),
+            },
         )
 
-    def test_efs_file_system(self, template) -> None:
-        """EFS must be created for model storage."""
-        template.resource_count_is("AWS::EFS::FileSystem", 1)
+    def test_warmup_schedule(self, template) -> None:
+        """EventBridge pings the alias every 5 minutes with a warmup event."""
         template.has_resource_properties(
-            "AWS::EFS::FileSystem", {"Encrypted": True},
+            "AWS::Events::Rule",
+            {
+                "ScheduleExpression": "rate(5 minutes)",
+                "Targets": [
+                    assertions.Match.object_like(
+                        {
+                            "Input": '{"warmup":true}',
+                            "RetryPolicy": {"MaximumRetryAttempts": 0},
+                        }
+                    )
+                ],
+            },
         )
 
-    def test_efs_access_point(self, template) -> None:
-        template.resource_count_is("AWS::EFS::AccessPoint", 1)
+    def test_efs_file_system(self, by_type) -> None:
+        """EFS must be created for model storage."""
+        (fs,) = by_type["AWS::EFS::FileSystem"]
+        assert fs["Encrypted"] is True
+        assert fs["ThroughputMode"] == "elastic"
+
+    def test_efs_access_point(self, counts) -> None:
+        assert counts["AWS::EFS::AccessPoint"] == 1
 
-    def test_vpc_created(self, template) -> None:
-        template.resource_count_is("AWS::EC2::VPC", 1)
+    def test_vpc_created(self, counts) -> None:
+        assert counts["AWS::EC2::VPC"] == 1
+        assert counts["AWS::EC2::NatGateway"] == 2
 
-    def test_efs_provisioner(self, template) -> None:
+    def test_reserved_concurrency(self, template) -> None:
+        """Reserved concurrency caps EFS cold-start storms; alarm at 80%."""
+        template.has_resource_properties(
+            "AWS::Lambda::Function",
+            {"Handler": "handler.handler", "ReservedConcurrentExecutions": 20},
+        )
+        template.has_resource_properties(
+            "AWS::CloudWatch::Alarm",
+            {"MetricName": "ConcurrentExecutions", "Threshold": 16},
+        )
+
+    def test_efs_provisioner(self, counts) -> None:
         """Provisioner Custom Resource must exist to populate EFS."""
-        template.resource_count_is("AWS::CloudFormation::CustomResource", 1)
+        assert counts["AWS::CloudFormation::CustomResource"] == 1
 
-    def test_lambda_functions(self, template) -> None:
+    def test_lambda_functions(self, counts) -> None:
         """OCR handler + EFS provisioner + S3 auto-delete helper."""
-        template.resource_count_is("AWS::Lambda::Function", 3)
+        assert counts["AWS::Lambda::Function"] == 3
 
-    def test_uses_efs_for_models(self) -> None:
-        """CDK stack must use EFS mount, not layer, for models."""
-        stack_src = (CDK_DIR / "stacks" / "ocr_lambda_stack.py").read_text()
-        assert "/mnt/models" in stack_src
-        assert "FileSystem.from_efs_access_point" in stack_src
+    def test_no_snapstart_with_efs(self, template) -> None:
+        """SnapStart is rejected by Lambda for EFS-mounted functions."""
+        functions = template.find_resources(
+            "AWS::Lambda::Function",
+            {"Properties": {"Handler": "handler.handler"}},
+        )
+        assert len(functions) == 1
+        props = next(iter(functions.values()))["Properties"]
+        assert "FileSystemConfigs" in props
+        assert "SnapStart" not in props
 
-    def test_s3_bucket_secured(self, template) -> None:
+    def test_uses_efs_for_models(self, ocr_stack_src) -> None:
+        """CDK stack must use EFS mount, not layer, for models."""
+        assert "/mnt/models" in ocr_stack_src
+        assert "FileSystem.from_efs_access_point" in ocr_stack_src
+
+    def test_s3_bucket_secured(self, by_type) -> None:
+        (bucket,) = by_type["AWS::S3::Bucket"]
+        assert bucket["PublicAccessBlockConfiguration"] == {
+            "BlockPublicAcls": True,
+            "BlockPublicPolicy": True,
+            "IgnorePublicAcls": True,
+            "RestrictPublicBuckets": True,
+        }
+
+    def test_result_cache_table(self, template) -> None:
+        """OCR results for S3 inputs are cached in DynamoDB with a TTL."""
         template.has_resource_properties(
-            "AWS::S3::Bucket",
+            "AWS::DynamoDB::Table",
             {
-                "PublicAccessBlockConfiguration": {
-                    "BlockPublicAcls": True,
-                    "BlockPublicPolicy": True,
-                    "IgnorePublicAcls": True,
-                    "RestrictPublicBuckets": True,
-                }
+                "KeySchema": [{"AttributeName": "image_key", "KeyType": "HASH"}],
+                "BillingMode": "PAY_PER_REQUEST",
+                "TimeToLiveSpecification": {"AttributeName": "ttl", "Enabled": True},
             },
         )
-
-    def test_monitoring(self, template) -> None:
         template.has_resource_properties(
-            "AWS::Logs::LogGroup", {"RetentionInDays": 30},
+            "AWS::Lambda::Function",
+            {
+                "Handler": "handler.handler",
+                "Environment": {
+                    "Variables": assertions.Match.object_like(
+                        {
+                            "RESULT_CACHE_TABLE": assertions.Match.any_value(),
+                            "OCR_ASSET_HASH": assertions.Match.any_value(),
+                        }
+                    ),
+                },
+            },
         )
-        template.resource_count_is("AWS::CloudWatch::Alarm", 2)
+
+    def test_monitoring(self, by_type, counts) -> None:
+        assert any(
+            g.get("RetentionInDays") == 30 for g in by_type["AWS::Logs::LogGroup"]
+        )
+        assert counts["AWS::CloudWatch::Alarm"] == 4
+        assert any(
+            a.get("Namespace") == "AWS/EFS" and a.get("MetricName") == "PercentIOLimit"
+            for a in by_type["AWS::CloudWatch::Alarm"]
+        )
+
+
+@pytest.mark.skipif(not CDK_AVAILABLE, reason="aws-cdk-lib not installed")
+class TestAssetHash:
+    """OCR_ASSET_HASH / ProvisionHash must change with any code or asset change."""
+
+    @pytest.fixture
+    def src(self, tmp_path) -> Path:
+        (tmp_path / "model").mkdir()
+        (tmp_path / "model" / "a.onnx").write_bytes(b"weights-v1")
+        (tmp_path / "ocr.py").write_text("print('v1')\n")
+        return tmp_path
+
+    def test_stable(self, src) -> None:
+        from stacks.ocr_lambda_stack import _tree_hash
+
+        assert _tree_hash(str(src)) == _tree_hash(str(src))
+
+    def test_content_change(self, src) -> None:
+        from stacks.ocr_lambda_stack import _tree_hash
+
+        before = _tree_hash(str(src))
+        (src / "model" / "a.onnx").write_bytes(b"weights-v2")
+        assert _tree_hash(str(src)) != before
+
+    def test_added_file(self, src) -> None:
+        from stacks.ocr_lambda_stack import _tree_hash
+
+        before = _tree_hash(str(src))
+        (src / "extra.py").write_text("")
+        assert _tree_hash(str(src)) != before
+
+    def test_bytecode_ignored(self, src) -> None:
+        from stacks.ocr_lambda_stack import _tree_hash
+
+        before = _tree_hash(str(src))
+        (src / "__pycache__").mkdir()
+        (src / "__pycache__" / "ocr.cpython-312.pyc").write_bytes(b"\0")
+        (src / "stale.pyc").write_bytes(b"\0")
+        assert _tree_hash(str(src)) == before
 
 
 # ---------------------------------------------------------------------------
@@ -188,45 +329,24 @@ class TestOcrLambdaStack:
 # ---------------------------------------------------------------------------
 
 
-@pytest.mark.skipif(
-    not (CDK_AVAILABLE and AGENTCORE_AVAILABLE),
-    reason="aws-cdk-lib or agentcore-alpha not installed",
-)
+# gateway_template skips per test when agentcore-alpha is missing
+@pytest.mark.skipif(not CDK_AVAILABLE, reason="aws-cdk-lib not installed")
+@pytest.mark.xdist_group("cdk")
 class TestGatewayStack:
     """Gateway must route to the Lambda alias with correct MCP protocol."""
 
-    @pytest.fixture(scope="class")
-    def template(self):
-        from stacks.ocr_lambda_stack import OcrLambdaStack
-        from stacks.gateway_stack import GatewayStack
-
-        app = cdk.App()
-        ocr = OcrLambdaStack(app, "TestOcr2", stack_prefix="test-ocr")
-        gw = GatewayStack(
-            app, "TestGw", stack_prefix="test-ocr",
-            lambda_function=ocr.lambda_function,
-            lambda_alias=ocr.lambda_alias,
-        )
-        return assertions.Template.from_stack(gw)
+    def test_gateway_with_mcp_protocol(self, gateway_resources_by_type) -> None:
+        (gateway,) = gateway_resources_by_type["AWS::BedrockAgentCore::Gateway"]
+        assert gateway["ProtocolType"] == "MCP"
 
-    def test_gateway_with_mcp_protocol(self, template) -> None:
-        template.resource_count_is("AWS::BedrockAgentCore::Gateway", 1)
-        template.has_resource_properties(
-            "AWS::BedrockAgentCore::Gateway",
-            {"ProtocolType": "MCP"},
-        )
+    def test_gateway_target_exists(self, gateway_resource_counts) -> None:
+        assert gateway_resource_counts["AWS::BedrockAgentCore::GatewayTarget"] == 1
 
-    def test_gateway_target_exists(self, template) -> None:
-        template.resource_count_is("AWS::BedrockAgentCore::GatewayTarget", 1)
-
-    def test_iam_auth(self, template) -> None:
-        template.has_resource_properties(
-            "AWS::BedrockAgentCore::Gateway",
-            {"AuthorizerType": "AWS_IAM"},
-        )
+    def test_iam_auth(self, gateway_resources_by_type) -> None:
+        (gateway,) = gateway_resources_by_type["AWS::BedrockAgentCore::Gateway"]
+        assert gateway["AuthorizerType"] == "AWS_IAM"
 
-    def test_schema_file_path_resolves(self) -> None:
-        computed = CDK_DIR / "schemas" / "ocr-tool-schema.json"
-        assert computed.exists()
-        with open(computed) as f:
-            json.load(f)  # must be valid JSON
+    def test_schema_file_path_resolves(self, tool_schema) -> None:
+        # tool_schema already parsed the file, so it is valid JSON
+        assert SCHEMA_PATH.exists()
+        assert tool_schema
@@ -10,20 +10,26 @@ onnxruntime and models are installed — serves as the deployment gate.
 from __future__ import annotations
 
 import base64
+import builtins
+import functools
+import importlib
 import io
 import json
-import os
+import sys
+import tempfile
+import uuid
+from unittest import mock
 
 import numpy as np
-import pypdfium2 as pdfium
 import pytest
 from PIL import Image, ImageDraw
 
-from helpers import requires_models
+from helpers import BLANK_PDFS, requires_models, requires_vendor_src
 
 
+@functools.lru_cache(maxsize=8)
 def _make_image_b64(width: int = 400, height: int = 300, with_text: bool = True) -> str:
-    """Create a base64-encoded JPEG test image with text-like dark regions."""
+    """Create a base64-encoded JPEG test image with text-like dark regions (cached)."""
     img = Image.new("RGB", (width, height), color=(255, 255, 255))
     if with_text:
         draw = ImageDraw.Draw(img)
@@ -31,24 +37,32 @@ def _make_image_b64(width: int = 400, height: int = 300, with_text: bool = True)
         for y in range(50, height - 50, 40):
             draw.rectangle([30, y, width - 30, y + 15], fill=(0, 0, 0))
     buf = io.BytesIO()
-    img.save(buf, format="JPEG")
+    # Cheapest encode settings; the tests only need dark bands, not fidelity
+    img.save(buf, format="JPEG", quality=40, optimize=False, subsampling=2)
     return base64.b64encode(buf.getvalue()).decode()
 
 
+@functools.lru_cache(maxsize=8)
 def _make_pdf_b64(num_pages: int = 2) -> str:
-    """Create a base64-encoded PDF with blank pages."""
-    pdf = pdfium.PdfDocument.new()
-    for _ in range(num_pages):
-        pdf.new_page(400, 300)
-    buf = io.BytesIO()
-    pdf.save(buf)
-    pdf.close()
-    return base64.b64encode(buf.getvalue()).decode()
+    """Create a base64-encoded PDF with blank pages (cached)."""
+    data = BLANK_PDFS.get(num_pages)
+    if data is None:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument.new()
+        for _ in range(num_pages):
+            pdf.new_page(400, 300)
+        buf = io.BytesIO()
+        pdf.save(buf)
+        pdf.close()
+        data = buf.getvalue()
+    return base64.b64encode(data).decode()
 
 
 class FakeContext:
     """Minimal Lambda context for local testing."""
-    aws_request_id: str = "handler-e2e-test"
+    # Unique per process so parallel workers never share request-scoped state
+    aws_request_id: str = f"handler-e2e-{uuid.uuid4().hex}"
     function_name: str = "ndl-ocr-lite"
     memory_limit_in_mb: int = 3008
 
@@ -56,27 +70,46 @@ class FakeContext:
         return 60000
 
 
+@pytest.fixture(scope="session")
+def fake_ctx() -> FakeContext:
+    """One shared context; handler() never mutates it."""
+    return FakeContext()
+
+
+@pytest.fixture(scope="module")
+def mocked_handler_fn():
+    """Import handler with onnxruntime.InferenceSession mocked (no weights parsed).
+
+    The mocked module is removed from sys.modules afterwards so ocr_handler
+    still gets the real one.
+    """
+    saved = sys.modules.pop("handler", None)
+    try:
+        with mock.patch("onnxruntime.InferenceSession", mock.MagicMock()):
+            handler = importlib.import_module("handler")
+    finally:
+        sys.modules.pop("handler", None)
+        if saved is not None:
+            sys.modules["handler"] = saved
+    return handler.handler
+
+
 @requires_models
+@pytest.mark.xdist_group("models")  # load the 4 ONNX models on one worker only
 class TestHandlerWithImage:
     """Test handler() with base64-encoded images."""
 
-    @pytest.fixture(autouse=True)
-    def _import_handler(self) -> None:
-        """Import handler (loads models) once for the test class."""
-        import handler as _handler
-        self.handler = _handler.handler
-
-    def test_single_image_returns_200(self) -> None:
+    def test_single_image_returns_200(self, ocr_handler, fake_ctx) -> None:
         event = {"image": _make_image_b64()}
-        result = self.handler(event, FakeContext())
+        result = ocr_handler(event, fake_ctx)
 
         assert result["statusCode"] == 200
         assert "pages" in result["body"]
         assert len(result["body"]["pages"]) == 1
 
-    def test_page_structure(self) -> None:
+    def test_page_structure(self, ocr_handler, fake_ctx) -> None:
         event = {"image": _make_image_b64()}
-        result = self.handler(event, FakeContext())
+        result = ocr_handler(event, fake_ctx)
 
         page = result["body"]["pages"][0]
         assert page["page"] == 1
@@ -89,9 +122,9 @@ class TestHandlerWithImage:
         assert "contents" in page
         assert isinstance(page["contents"], list)
 
-    def test_contents_fields(self) -> None:
+    def test_contents_fields(self, ocr_handler, fake_ctx) -> None:
         event = {"image": _make_image_b64()}
-        result = self.handler(event, FakeContext())
+        result = ocr_handler(event, fake_ctx)
 
         for item in result["body"]["pages"][0]["contents"]:
             assert "boundingBox" in item
@@ -102,44 +135,55 @@ class TestHandlerWithImage:
             assert "isTextline" in item
             assert "confidence" in item
 
-    def test_response_is_json_serializable(self) -> None:
+    def test_response_is_json_serializable(self, ocr_handler, fake_ctx) -> None:
         event = {"image": _make_image_b64()}
-        result = self.handler(event, FakeContext())
+        result = ocr_handler(event, fake_ctx)
 
         # Must be serializable — Lambda runtime does this
         serialized = json.dumps(result, ensure_ascii=False)
         deserialized = json.loads(serialized)
         assert deserialized["statusCode"] == 200
 
-    def test_tmp_cleaned_up_after_invocation(self) -> None:
+    def test_no_tmp_files_written(
+        self, ocr_handler, fake_ctx, tmp_path, monkeypatch
+    ) -> None:
+        # A private TMPDIR plus an open() spy instead of diffing /tmp, which
+        # other xdist workers (CDK synth) write to concurrently.
+        monkeypatch.setenv("TMPDIR", str(tmp_path))
+        monkeypatch.setattr(tempfile, "tempdir", None)
+        written: list[str] = []
+        real_open = builtins.open
+
+        def _spy_open(file, mode="r", *args, **kwargs):
+            if any(flag in mode for flag in "wax+"):
+                written.append(str(file))
+            return real_open(file, mode, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "open", _spy_open)
         event = {"image": _make_image_b64()}
-        self.handler(event, FakeContext())
+        ocr_handler(event, fake_ctx)
 
-        work_dir = os.path.join("/tmp", FakeContext.aws_request_id)
-        assert not os.path.exists(work_dir)
+        assert written == []
+        assert list(tmp_path.iterdir()) == []
 
 
 @requires_models
+@pytest.mark.xdist_group("models")
 class TestHandlerWithPdf:
     """Test handler() with base64-encoded PDFs."""
 
-    @pytest.fixture(autouse=True)
-    def _import_handler(self) -> None:
-        import handler as _handler
-        self.handler = _handler.handler
-
-    def test_pdf_returns_multiple_pages(self) -> None:
+    def test_pdf_returns_multiple_pages(self, ocr_handler, fake_ctx) -> None:
         event = {"image": _make_pdf_b64(num_pages=2)}
-        result = self.handler(event, FakeContext())
+        result = ocr_handler(event, fake_ctx)
 
         assert result["statusCode"] == 200
         assert len(result["body"]["pages"]) == 2
         assert result["body"]["pages"][0]["page"] == 1
         assert result["body"]["pages"][1]["page"] == 2
 
-    def test_pdf_with_pages_param(self) -> None:
+    def test_pdf_with_pages_param(self, ocr_handler, fake_ctx) -> None:
         event = {"image": _make_pdf_b64(num_pages=3), "pages": "1,3"}
-        result = self.handler(event, FakeContext())
+        result = ocr_handler(event, fake_ctx)
 
         assert result["statusCode"] == 200
         assert len(result["body"]["pages"]) == 2
@@ -147,26 +191,27 @@ class TestHandlerWithPdf:
         assert result["body"]["pages"][1]["page"] == 2  # page numbering is sequential in output
 
 
-@requires_models
+@requires_vendor_src
+@pytest.mark.no_models
 class TestHandlerErrors:
-    """Test handler() error paths."""
+    """Test handler() error paths (rejected before inference; models mocked)."""
 
-    @pytest.fixture(autouse=True)
-    def _import_handler(self) -> None:
-        import handler as _handler
-        self.handler = _handler.handler
-
-    def test_missing_image_returns_400(self) -> None:
-        result = self.handler({}, FakeContext())
+    def test_missing_image_returns_400(self, mocked_handler_fn, fake_ctx) -> None:
+        result = mocked_handler_fn({}, fake_ctx)
         assert result["statusCode"] == 400
         assert "error" in result["body"]
         assert "Missing required parameter" in result["body"]["error"]
 
-    def test_invalid_base64_returns_400(self) -> None:
-        result = self.handler({"image": "not-valid!!!"}, FakeContext())
+    def test_invalid_base64_returns_400(self, mocked_handler_fn, fake_ctx) -> None:
+        result = mocked_handler_fn({"image": "not-valid!!!"}, fake_ctx)
         assert result["statusCode"] == 400
         assert "error" in result["body"]
 
-    def test_empty_image_returns_400(self) -> None:
-        result = self.handler({"image": ""}, FakeContext())
+    def test_empty_image_returns_400(self, mocked_handler_fn, fake_ctx) -> None:
+        result = mocked_handler_fn({"image": ""}, fake_ctx)
         assert result["statusCode"] == 400
+
+    def test_warmup_short_circuits(self, mocked_handler_fn, fake_ctx) -> None:
+        result = mocked_handler_fn({"warmup": True}, fake_ctx)
+        assert result["statusCode"] == 200
+        assert result["body"] == {"warm": True}
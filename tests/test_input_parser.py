@@ -0,0 +1,260 @@
+"""Unit tests for input_parser (stub S3 client, no AWS or models)."""
+
+from __future__ import annotations
+
+import base64
+import io
+import re
+
+import numpy as np
+import pytest
+from botocore.exceptions import ClientError
+from PIL import Image
+
+import input_parser
+from helpers import BLANK_PDFS
+
+
+def _reference_parse_pages(pages_str: str | None, total_pages: int) -> list[int]:
+    """The original set-based parse_pages, kept as the behavioural reference."""
+    if not pages_str:
+        return list(range(total_pages))
+
+    indices: set[int] = set()
+    for part in pages_str.split(","):
+        part = part.strip()
+        if "-" in part:
+            start_str, end_str = part.split("-", 1)
+            start = int(start_str.strip())
+            end = int(end_str.strip())
+            for p in range(start, end + 1):
+                if 1 <= p <= total_pages:
+                    indices.add(p - 1)
+        else:
+            p = int(part)
+            if 1 <= p <= total_pages:
+                indices.add(p - 1)
+
+    return sorted(indices)
+
+
+class TestParsePages:
+    """parse_pages must match the reference for every input, malformed included."""
+
+    @pytest.mark.parametrize("total", [0, 1, 5, 10])
+    @pytest.mark.parametrize(
+        "pages_str",
+        [
+            None, "",
+            # single pages, duplicates, whitespace
+            "1", "3", "1,3,5", "5,3,1", "2,2,2", " 2 , 4 ",
+            # ranges, reversed ranges, overlaps
+            "2-4", "4-2", "3-3", "1-3,2-5", "1-2,8-9", " 2 - 4 ",
+            # 0 and out-of-range pages
+            "0", "0-2", "11", "6-20", "0,11", "9-12,1",
+            # the "1-N" full-range shortcut and near misses
+            "1-5", "1-10", "1-100", "0-10", "1-4", "2-10",
+        ],
+    )
+    def test_matches_reference(self, pages_str, total) -> None:
+        assert input_parser.parse_pages(pages_str, total) == _reference_parse_pages(
+            pages_str, total
+        )
+
+    @pytest.mark.parametrize(
+        "pages_str", ["a", "1,a", "1-b", "-3", "1-", "1,,3", "1-a", "x-5,1"]
+    )
+    def test_malformed_raises_like_reference(self, pages_str) -> None:
+        with pytest.raises(ValueError):
+            _reference_parse_pages(pages_str, 5)
+        with pytest.raises(ValueError):
+            input_parser.parse_pages(pages_str, 5)
+
+    def test_huge_range_is_clamped(self) -> None:
+        assert input_parser.parse_pages("2-1000000000", 3) == [1, 2]
+
+
+def _encode(img: Image.Image, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format=fmt)
+    return buf.getvalue()
+
+
+class TestDecodeImage:
+    """Magic-byte sniffing picks the PIL plugin; every mode decodes to RGB."""
+
+    @pytest.mark.parametrize("fmt", ["PNG", "JPEG", "WEBP"])
+    def test_sniffs_and_decodes(self, fmt) -> None:
+        data = _encode(Image.new("RGB", (8, 4), (200, 10, 10)), fmt)
+        assert input_parser._sniff_image_format(data) == fmt
+
+        arr = input_parser._decode_image(data)
+        assert arr.shape == (4, 8, 3)
+        assert arr.dtype == np.uint8
+
+    def test_rgba_converted_to_rgb(self) -> None:
+        data = _encode(Image.new("RGBA", (3, 2), (0, 255, 0, 128)), "PNG")
+        arr = input_parser._decode_image(data)
+        assert arr.shape == (2, 3, 3)
+        assert tuple(arr[0, 0]) == (0, 255, 0)
+
+    def test_palette_converted_to_rgb(self) -> None:
+        img = Image.new("P", (3, 2))
+        img.putpalette([0, 0, 0, 10, 20, 30] + [0] * (256 * 3 - 6))
+        img.putpixel((0, 0), 1)
+        arr = input_parser._decode_image(_encode(img, "PNG"))
+        assert arr.shape == (2, 3, 3)
+        assert tuple(arr[0, 0]) == (10, 20, 30)
+
+    def test_grayscale_converted_to_rgb(self) -> None:
+        arr = input_parser._decode_image(_encode(Image.new("L", (2, 2), 77), "PNG"))
+        assert arr.shape == (2, 2, 3)
+        assert (arr == 77).all()
+
+    def test_unsniffed_format_falls_back_to_probing(self) -> None:
+        data = _encode(Image.new("RGB", (2, 2)), "BMP")
+        assert input_parser._sniff_image_format(data) is None
+        assert input_parser._decode_image(data).shape == (2, 2, 3)
+
+    @pytest.mark.parametrize(
+        "data",
+        [b"", b"not an image", b"\xff\xd8\xff truncated jpeg", b"RIFF\0\0\0\0WEBPjunk"],
+        ids=["empty", "text", "bad-jpeg", "bad-webp"],
+    )
+    def test_unknown_or_corrupt_bytes_raise(self, data) -> None:
+        with pytest.raises(ValueError, match="Cannot decode image data"):
+            input_parser._decode_image(data)
+
+
+class _StubS3:
+    """Serves one object through ranged get_object calls, like S3 does."""
+
+    def __init__(self, data: bytes, etag: str = '"v1"') -> None:
+        self.data = data
+        self.etag = etag
+        self.calls: list[dict] = []
+
+    def get_object(self, Bucket: str, Key: str, Range: str, **kwargs) -> dict:
+        self.calls.append({"Range": Range, **kwargs})
+        if "IfMatch" in kwargs and kwargs["IfMatch"] != self.etag:
+            raise ClientError(
+                {"Error": {"Code": "PreconditionFailed", "Message": ""}}, "GetObject"
+            )
+        start, end = map(int, re.fullmatch(r"bytes=(\d+)-(\d+)", Range).groups())
+        if start >= len(self.data):
+            raise ClientError(
+                {"Error": {"Code": "InvalidRange", "Message": ""}}, "GetObject"
+            )
+        end = min(end, len(self.data) - 1)
+        return {
+            "Body": io.BytesIO(self.data[start:end + 1]),
+            "ContentRange": f"bytes {start}-{end}/{len(self.data)}",
+            "ETag": self.etag,
+        }
+
+
+@pytest.fixture
+def stub_s3(monkeypatch):
+    """Install a _StubS3 for the given bytes as input_parser.s3_client."""
+
+    def _install(data: bytes, **kwargs) -> _StubS3:
+        stub = _StubS3(data, **kwargs)
+        monkeypatch.setattr(input_parser, "s3_client", stub)
+        return stub
+
+    return _install
+
+
+class TestFetchS3:
+    def test_first_get_pinned_to_given_etag(self, stub_s3) -> None:
+        stub = stub_s3(b"small object")
+        assert input_parser._fetch_s3("s3://b/k", etag='"v1"') == b"small object"
+        assert stub.calls[0]["IfMatch"] == '"v1"'
+
+    def test_object_replaced_after_head_is_rejected(self, stub_s3) -> None:
+        stub_s3(b"new content", etag='"v2"')
+        with pytest.raises(ValueError, match="changed while reading"):
+            input_parser._fetch_s3("s3://b/k", etag='"v1"')
+
+    @pytest.fixture
+    def small_parts(self, monkeypatch) -> int:
+        monkeypatch.setattr(input_parser, "_S3_PART_SIZE", 4)
+        return 4
+
+    def test_small_object_single_request(self, stub_s3, small_parts) -> None:
+        stub = stub_s3(b"abc")
+        assert input_parser._fetch_s3("s3://b/k") == b"abc"
+        assert [c["Range"] for c in stub.calls] == ["bytes=0-3"]
+        assert "IfMatch" not in stub.calls[0]
+
+    def test_exactly_one_part_single_request(self, stub_s3, small_parts) -> None:
+        stub = stub_s3(b"abcd")
+        assert input_parser._fetch_s3("s3://b/k") == b"abcd"
+        assert len(stub.calls) == 1
+
+    @pytest.mark.parametrize("size", [5, 8, 9, 10, 33])
+    def test_part_boundaries(self, stub_s3, small_parts, size) -> None:
+        data = bytes(range(size))
+        stub = stub_s3(data)
+        assert input_parser._fetch_s3("s3://b/k") == data
+
+        ranges = sorted(
+            tuple(map(int, c["Range"][len("bytes="):].split("-"))) for c in stub.calls
+        )
+        expected = [
+            (start, min(start + small_parts, size) - 1)
+            for start in range(0, size, small_parts)
+        ]
+        assert ranges == expected
+
+    def test_remaining_parts_pinned_to_first_etag(self, stub_s3, small_parts) -> None:
+        stub = stub_s3(b"0123456789")
+        input_parser._fetch_s3("s3://b/k")
+        assert all(c["IfMatch"] == '"v1"' for c in stub.calls[1:])
+
+    def test_object_replaced_mid_read_is_rejected(self, stub_s3, small_parts) -> None:
+        stub = stub_s3(b"0123456789")
+        real_get = stub.get_object
+
+        def _replace_after_first(**kwargs):
+            response = real_get(**kwargs)
+            stub.etag = '"v2"'
+            return response
+
+        stub.get_object = _replace_after_first
+        with pytest.raises(ValueError, match="changed while reading"):
+            input_parser._fetch_s3("s3://b/k")
+
+    def test_zero_byte_object(self, stub_s3) -> None:
+        stub = stub_s3(b"")
+        assert input_parser._fetch_s3("s3://b/k") == b""
+        assert len(stub.calls) == 1
+
+
+class TestParseInput:
+    """PDF open and page parsing happen in parse_input, not on first next()."""
+
+    @staticmethod
+    def _event(data: bytes, **extra) -> dict:
+        return {"image": base64.b64encode(data).decode(), **extra}
+
+    def test_pdf_pages_rendered_lazily(self) -> None:
+        images, is_pdf = input_parser.parse_input(
+            self._event(BLANK_PDFS[3], pages="1,3")
+        )
+        assert is_pdf
+        pages = list(images)
+        assert len(pages) == 2
+        assert pages[0].ndim == 3 and pages[0].shape[2] == 3
+
+    def test_corrupt_pdf_raises_before_iteration(self) -> None:
+        with pytest.raises(ValueError, match="Cannot open PDF"):
+            input_parser.parse_input(self._event(b"%PDF-1.4\ngarbage"))
+
+    def test_malformed_pages_raises_before_iteration(self) -> None:
+        with pytest.raises(ValueError):
+            input_parser.parse_input(self._event(BLANK_PDFS[2], pages="1-x"))
+
+    def test_undecodable_image_raises(self) -> None:
+        with pytest.raises(ValueError, match="Cannot decode image data"):
+            input_parser.parse_input(self._event(b"not an image"))
@@ -0,0 +1,46 @@
+"""Unit tests for the EMF metrics line (stdout only, no AWS or models)."""
+
+from __future__ import annotations
+
+import json
+import time
+
+from metrics import emit_metrics
+
+
+def _emitted(capsys) -> dict:
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1, "EMF must be exactly one JSON line"
+    return json.loads(lines[0])
+
+
+class TestEmitMetrics:
+    def test_emf_shape(self, capsys, monkeypatch) -> None:
+        monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "test-ocr-ocr")
+        before = int(time.time() * 1000)
+        emit_metrics(Pages=3, EmptyPages=1)
+        doc = _emitted(capsys)
+
+        directive, = doc["_aws"]["CloudWatchMetrics"]
+        assert directive["Namespace"] == "NDLOCR"
+        assert directive["Dimensions"] == [["FunctionName"]]
+        assert directive["Metrics"] == [
+            {"Name": "Pages", "Unit": "Count"},
+            {"Name": "EmptyPages", "Unit": "Count"},
+        ]
+        assert before <= doc["_aws"]["Timestamp"] <= int(time.time() * 1000)
+        assert doc["FunctionName"] == "test-ocr-ocr"
+        assert doc["Pages"] == 3
+        assert doc["EmptyPages"] == 1
+
+    def test_every_metric_and_dimension_has_a_value(self, capsys) -> None:
+        emit_metrics(Pages=0, EmptyPages=0)
+        doc = _emitted(capsys)
+        directive, = doc["_aws"]["CloudWatchMetrics"]
+        for name in [m["Name"] for m in directive["Metrics"]] + directive["Dimensions"][0]:
+            assert name in doc
+
+    def test_function_name_defaults_to_local(self, capsys, monkeypatch) -> None:
+        monkeypatch.delenv("AWS_LAMBDA_FUNCTION_NAME", raising=False)
+        emit_metrics(Pages=1)
+        assert _emitted(capsys)["FunctionName"] == "local"
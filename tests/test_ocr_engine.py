@@ -0,0 +1,152 @@
+"""Unit tests for ocr_engine helpers that need no vendor source or model weights."""
+
+from __future__ import annotations
+
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import ocr_engine
+
+
+class _FakeSession:
+    """Exposes get_inputs()/run() like onnxruntime.InferenceSession."""
+
+    def __init__(self, inputs: list[SimpleNamespace], error: Exception | None = None) -> None:
+        self._inputs = inputs
+        self.error = error
+        self.feeds: dict[str, np.ndarray] | None = None
+
+    def get_inputs(self) -> list[SimpleNamespace]:
+        return self._inputs
+
+    def run(self, output_names, feeds: dict) -> list:
+        self.feeds = feeds
+        if self.error:
+            raise self.error
+        return []
+
+
+def _input(name: str, shape: list, type_: str = "tensor(float)") -> SimpleNamespace:
+    return SimpleNamespace(name=name, shape=shape, type=type_)
+
+
+class TestWarmUp:
+    def test_fixed_dims(self) -> None:
+        session = _FakeSession([_input("images", [1, 3, 1024, 1024])])
+        ocr_engine.warm_up(SimpleNamespace(session=session))
+
+        feed = session.feeds["images"]
+        assert feed.shape == (1, 3, 1024, 1024)
+        assert feed.dtype == np.float32
+        assert not feed.any()
+
+    @pytest.mark.parametrize("dim", ["batch", None, -1, 0])
+    def test_symbolic_dims_become_one(self, dim) -> None:
+        session = _FakeSession([_input("x", [dim, 3, 16, 256])])
+        ocr_engine.warm_up(SimpleNamespace(session=session))
+        assert session.feeds["x"].shape == (1, 3, 16, 256)
+
+    def test_multiple_inputs_and_dtypes(self) -> None:
+        session = _FakeSession([
+            _input("images", ["N", 3, 640, 640]),
+            _input("orig_target_sizes", ["N", 2], "tensor(int64)"),
+            _input("half", [2], "tensor(float16)"),
+            _input("unknown", [1], "tensor(bool)"),
+        ])
+        ocr_engine.warm_up(SimpleNamespace(session=session))
+
+        feeds = session.feeds
+        assert feeds["images"].shape == (1, 3, 640, 640)
+        assert feeds["orig_target_sizes"].dtype == np.int64
+        assert feeds["orig_target_sizes"].shape == (1, 2)
+        assert feeds["half"].dtype == np.float16
+        assert feeds["unknown"].dtype == np.float32  # fallback
+
+    def test_run_failure_is_logged_not_raised(self, caplog) -> None:
+        session = _FakeSession([_input("x", [1])], error=RuntimeError("bad shape"))
+        ocr_engine.warm_up(SimpleNamespace(session=session))
+        assert "Warm-up run failed" in caplog.text
+
+    def test_model_without_session_is_skipped(self) -> None:
+        ocr_engine.warm_up(SimpleNamespace())  # must not raise
+
+
+class TestTunedSessions:
+    """tuned_sessions wraps InferenceSession only for the duration of the block."""
+
+    @pytest.fixture
+    def fake_ort(self, monkeypatch):
+        """Replace onnxruntime.InferenceSession with a recorder (no model files)."""
+        onnxruntime = pytest.importorskip("onnxruntime")
+        created: list[tuple] = []
+
+        class _FakeInferenceSession:
+            def __init__(self, path_or_bytes, sess_options=None, *args, **kwargs):
+                if path_or_bytes == "missing.onnx":
+                    raise FileNotFoundError(path_or_bytes)
+                created.append((path_or_bytes, sess_options, kwargs))
+
+        monkeypatch.setattr(onnxruntime, "InferenceSession", _FakeInferenceSession)
+        return onnxruntime, _FakeInferenceSession, created
+
+    def test_sessions_get_tuned_options(self, fake_ort) -> None:
+        onnxruntime, _, created = fake_ort
+        with ocr_engine.tuned_sessions():
+            onnxruntime.InferenceSession("m.onnx", providers=["CPUExecutionProvider"])
+
+        (path, opts, kwargs), = created
+        assert path == "m.onnx"
+        assert kwargs == {"providers": ["CPUExecutionProvider"]}
+        assert opts.intra_op_num_threads == max(1, os.cpu_count() or 2)
+        assert opts.inter_op_num_threads == 1
+        assert opts.get_session_config_entry("session.intra_op.allow_spinning") == "0"
+        assert opts.get_session_config_entry("session.use_env_allocators") == "1"
+
+    def test_caller_options_tuned_in_place(self, fake_ort) -> None:
+        onnxruntime, _, created = fake_ort
+        opts = onnxruntime.SessionOptions()
+        opts.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL
+        with ocr_engine.tuned_sessions():
+            onnxruntime.InferenceSession("m.onnx", opts)
+
+        assert created[0][1] is opts
+        assert opts.graph_optimization_level == onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL
+
+    def test_restored_after_block(self, fake_ort) -> None:
+        onnxruntime, fake_cls, _ = fake_ort
+        with ocr_engine.tuned_sessions():
+            assert onnxruntime.InferenceSession is not fake_cls
+        assert onnxruntime.InferenceSession is fake_cls
+
+    def test_restored_when_load_raises(self, fake_ort) -> None:
+        onnxruntime, fake_cls, _ = fake_ort
+        with pytest.raises(FileNotFoundError):
+            with ocr_engine.tuned_sessions():
+                onnxruntime.InferenceSession("missing.onnx")
+        assert onnxruntime.InferenceSession is fake_cls
+
+
+class TestRecognizerModelPath:
+    """INT8 copy is used only when enabled and present on disk."""
+
+    NAME = "parseq-ndl-16x256-30-tiny-192epoch-tegaki3.onnx"
+
+    @pytest.mark.parametrize("quantize", [False, True])
+    def test_fp32_when_no_int8_file(self, tmp_path, quantize) -> None:
+        (tmp_path / self.NAME).touch()
+        path = ocr_engine.recognizer_model_path(str(tmp_path), self.NAME, quantize=quantize)
+        assert path == str(tmp_path / self.NAME)
+
+    @pytest.mark.parametrize(
+        "quantize, expected",
+        [(False, NAME), (True, NAME.replace(".onnx", ".int8.onnx"))],
+        ids=["off", "on"],
+    )
+    def test_int8_file_present(self, tmp_path, quantize, expected) -> None:
+        (tmp_path / self.NAME).touch()
+        (tmp_path / self.NAME.replace(".onnx", ".int8.onnx")).touch()
+        path = ocr_engine.recognizer_model_path(str(tmp_path), self.NAME, quantize=quantize)
+        assert path == str(tmp_path / expected)
@@ -0,0 +1,41 @@
+"""Unit tests for pdf_utils (no AWS or models)."""
+
+from __future__ import annotations
+
+import pytest
+
+from pdf_utils import prefetch
+
+
+class TestPrefetch:
+    """prefetch keeps order, re-raises producer errors, and stops on close."""
+
+    def test_preserves_order(self) -> None:
+        assert list(prefetch(iter(range(10)))) == list(range(10))
+
+    def test_empty(self) -> None:
+        assert list(prefetch(iter([]))) == []
+
+    def test_reraises_producer_error(self) -> None:
+        def _items():
+            yield 1
+            raise ValueError("bad page")
+
+        prefetched = prefetch(_items())
+        assert next(prefetched) == 1
+        with pytest.raises(ValueError, match="bad page"):
+            next(prefetched)
+
+    def test_close_stops_producer(self) -> None:
+        produced: list[int] = []
+
+        def _items():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        prefetched = prefetch(_items(), depth=2)
+        assert next(prefetched) == 0
+        prefetched.close()  # joins the producer thread
+        # At most: the consumed item, a full buffer, and one blocked put
+        assert len(produced) <= 4
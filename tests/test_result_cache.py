@@ -0,0 +1,150 @@
+"""Unit tests for the DynamoDB result cache (stub clients, no AWS or models)."""
+
+from __future__ import annotations
+
+import importlib
+import json
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+import result_cache
+
+
+def _client_error(code: str, op: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, op)
+
+
+class _StubS3:
+    """head_object returns a fixed (quoted) ETag, or raises."""
+
+    def __init__(self, etag: str = '"abc123"', error: Exception | None = None) -> None:
+        self.etag = etag
+        self.error = error
+
+    def head_object(self, **kwargs) -> dict:
+        if self.error:
+            raise self.error
+        return {"ETag": self.etag}
+
+
+class _StubDynamoDB:
+    """In-memory get_item/put_item keyed on image_key, optionally failing."""
+
+    def __init__(self, error: Exception | None = None) -> None:
+        self.items: dict[str, dict] = {}
+        self.error = error
+
+    def get_item(self, TableName: str, Key: dict) -> dict:
+        if self.error:
+            raise self.error
+        item = self.items.get(Key["image_key"]["S"])
+        return {"Item": item} if item else {}
+
+    def put_item(self, TableName: str, Item: dict) -> None:
+        if self.error:
+            raise self.error
+        self.items[Item["image_key"]["S"]] = Item
+
+
+@pytest.fixture
+def dynamodb(monkeypatch) -> _StubDynamoDB:
+    stub = _StubDynamoDB()
+    monkeypatch.setattr(result_cache, "_TABLE_NAME", "test-cache")
+    monkeypatch.setattr(result_cache, "_dynamodb", stub)
+    monkeypatch.setattr(result_cache, "s3_client", _StubS3())
+    return stub
+
+
+class TestCacheKey:
+    def test_disabled_without_table(self, monkeypatch) -> None:
+        monkeypatch.setattr(result_cache, "_dynamodb", None)
+        assert result_cache.cache_key({"image": "s3://b/k.png"}) == (None, None)
+
+    def test_base64_input_not_cached(self, dynamodb) -> None:
+        assert result_cache.cache_key({"image": "iVBORw0KGgo="}) == (None, None)
+
+    def test_head_object_error_skips_cache(self, dynamodb, monkeypatch) -> None:
+        monkeypatch.setattr(
+            result_cache, "s3_client", _StubS3(error=_client_error("404", "HeadObject"))
+        )
+        assert result_cache.cache_key({"image": "s3://b/missing.png"}) == (None, None)
+
+    def test_returns_raw_etag_for_if_match(self, dynamodb) -> None:
+        key, etag = result_cache.cache_key({"image": "s3://b/k.pdf"})
+        assert etag == '"abc123"'
+        assert key.startswith("b/k.pdf@abc123#")
+
+    def test_key_includes_pages(self, dynamodb) -> None:
+        all_pages, _ = result_cache.cache_key({"image": "s3://b/k.pdf"})
+        first, _ = result_cache.cache_key({"image": "s3://b/k.pdf", "pages": "1"})
+        again, _ = result_cache.cache_key({"image": "s3://b/k.pdf", "pages": "1"})
+        assert first != all_pages
+        assert first == again
+
+    def test_key_includes_model_version(self, dynamodb, monkeypatch) -> None:
+        event = {"image": "s3://b/k.pdf"}
+        fp32, _ = result_cache.cache_key(event)
+        monkeypatch.setattr(result_cache, "_MODEL_VERSION", "hash-q1")
+        int8, _ = result_cache.cache_key(event)
+        assert fp32 != int8
+        assert int8.endswith("|hash-q1")
+
+
+@pytest.mark.parametrize(
+    "env",
+    [{"OCR_ASSET_HASH": "code-v2"}, {"QUANTIZE_RECOGNIZERS": "1"}],
+    ids=["asset-hash", "quantize"],
+)
+def test_deploy_changes_key(monkeypatch, env) -> None:
+    """A new OCR_ASSET_HASH (code/model deploy) or INT8 switch yields a new key."""
+    event = {"image": "s3://b/k.pdf"}
+    keys = []
+    try:
+        monkeypatch.setenv("OCR_ASSET_HASH", "code-v1")
+        for overrides in ({}, env):
+            for name, value in overrides.items():
+                monkeypatch.setenv(name, value)
+            module = importlib.reload(result_cache)
+            monkeypatch.setattr(module, "_dynamodb", _StubDynamoDB())
+            monkeypatch.setattr(module, "s3_client", _StubS3())
+            keys.append(module.cache_key(event)[0])
+    finally:
+        monkeypatch.undo()
+        importlib.reload(result_cache)
+    assert keys[0] != keys[1]
+
+
+class TestGetPut:
+    def test_round_trip(self, dynamodb) -> None:
+        pages = [{"page": 1, "text": "日本語", "contents": []}]
+        result_cache.put("k", pages)
+        assert result_cache.get("k") == pages
+
+        item = dynamodb.items["k"]
+        ttl = int(item["ttl"]["N"])
+        assert abs(ttl - (time.time() + result_cache._TTL_SECONDS)) < 60
+
+    def test_miss(self, dynamodb) -> None:
+        assert result_cache.get("absent") is None
+
+    def test_expired_item_is_a_miss(self, dynamodb) -> None:
+        dynamodb.items["k"] = {
+            "image_key": {"S": "k"},
+            "pages": {"S": json.dumps([{"page": 1}])},
+            "ttl": {"N": str(int(time.time()) - 1)},
+        }
+        assert result_cache.get("k") is None
+
+    def test_oversized_result_not_stored(self, dynamodb) -> None:
+        pages = [{"page": 1, "text": "x" * result_cache._MAX_ITEM_BYTES}]
+        result_cache.put("k", pages)
+        assert dynamodb.items == {}
+
+    def test_client_errors_are_swallowed(self, dynamodb) -> None:
+        dynamodb.error = _client_error(
+            "ProvisionedThroughputExceededException", "GetItem"
+        )
+        assert result_cache.get("k") is None
+        result_cache.put("k", [{"page": 1}])  # must not raise